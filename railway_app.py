@@ -5,7 +5,10 @@ Complete email tracking system with send and open tracking
 
 import os
 import psycopg2
-from flask import Flask, Response, request, jsonify, send_from_directory
+import psycopg2.extras
+from flask import Flask, Response, request, jsonify, render_template, send_from_directory, copy_current_request_context
+from jinja2 import FileSystemBytecodeCache
+from flask_caching import Cache
 import logging
 from io import BytesIO, StringIO
 import csv
@@ -13,12 +16,20 @@ from PIL import Image
 import uuid
 import datetime
 from datetime import timezone, timedelta
+from types import MappingProxyType
 import base64
 import email
 import pickle
 import re
 import hashlib
 import json
+import functools
+import gzip
+import operator
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 
@@ -63,6 +74,20 @@ try:
 except ImportError:
     GSPREAD_AVAILABLE = False
 
+# orjson import (faster JSON serialization for the API responses)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# rjsmin import (minifies the prompts UI script once at import)
+try:
+    import rjsmin
+    RJSMIN_AVAILABLE = True
+except ImportError:
+    RJSMIN_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -82,6 +107,19 @@ def now_est():
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your-secret-key-here')
 
+# Templates ship with the deploy and never change at runtime - skip mtime checks, never evict
+# compiled templates, and reuse compiled template bytecode across workers / restarts.
+# Set before anything touches app.jinja_env (Flask-Caching registers its extension on init).
+app.jinja_options = {
+    **app.jinja_options,
+    'auto_reload': False,
+    'cache_size': -1,
+    'bytecode_cache': FileSystemBytecodeCache(),
+}
+
+# In-process response cache for static / rarely-changing views
+cache = Cache(app, config={'CACHE_TYPE': 'SimpleCache', 'CACHE_DEFAULT_TIMEOUT': 3600})
+
 # OpenAI configuration
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-5.2")  # Can be changed to "gpt-3.5-turbo", "gpt-4-turbo", etc.
 
@@ -174,6 +212,83 @@ def format_pardot_email(first_name, email_content, recipient_email, sender_name)
 # Global database connection status
 DB_AVAILABLE = False
 
+# Idle PostgreSQL connections kept for reuse, so requests skip the connect/TLS/auth handshake.
+# Call sites keep using get_db_connection() / conn.close(); a connection that is never closed
+# (e.g. on an error path) is simply garbage-collected instead of pinning a pool slot.
+DB_POOL_MAX_IDLE = 8
+DB_POOL_IDLE_SECONDS = 300  # Reconnect rather than reuse a connection idle longer than this
+DB_POOL_PING_AFTER_SECONDS = 5  # Check with SELECT 1 before reusing a connection idle longer than this
+_db_idle_connections = deque()
+
+class _PooledConnection(psycopg2.extensions.connection):
+    """psycopg2 connection whose close() hands it back to the idle pool instead of disconnecting."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements = set()  # Names PREPAREd on this session (see execute_prepared)
+
+    def close(self):
+        if not self.closed and len(_db_idle_connections) < DB_POOL_MAX_IDLE:
+            try:
+                # Match a real close(): anything not committed is discarded
+                if self.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    self.rollback()
+            except psycopg2.Error:
+                super().close()
+                return
+            self.released_at = time.monotonic()
+            _db_idle_connections.append(self)
+            return
+        super().close()
+
+def _connection_is_alive(conn):
+    """Cheap liveness check for a parked connection (the server or proxy may have dropped it)."""
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        conn.rollback()
+        return True
+    except psycopg2.Error:
+        return False
+
+def _checkout_idle_connection():
+    """Pop the most recently released idle connection that is still usable, or None."""
+    while True:
+        try:
+            conn = _db_idle_connections.pop()
+        except IndexError:
+            return None
+        idle_seconds = time.monotonic() - conn.released_at
+        if not conn.closed and idle_seconds < DB_POOL_IDLE_SECONDS and (
+                idle_seconds < DB_POOL_PING_AFTER_SECONDS or _connection_is_alive(conn)):
+            return conn
+        psycopg2.extensions.connection.close(conn)
+
+def fetch_all_dict(conn, query, params=None):
+    """Run a small, bounded query and return its rows as dicts (column name -> value).
+
+    Uses a regular client-side cursor, so the whole result is fetched in one round-trip;
+    a named (server-side) cursor is only worth it for unbounded scans.
+    """
+    with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cursor:
+        cursor.execute(query, params)
+        return cursor.fetchall()
+
+def execute_prepared(cursor, name, query, params=()):
+    """Execute a hot statement through a server-side prepared plan, preparing it once per connection.
+
+    query uses $1, $2, ... placeholders. Pooled connections outlive requests, so after the first
+    call on a connection Postgres skips parsing and planning it.
+    """
+    prepared = cursor.connection.prepared_statements
+    if name not in prepared:
+        cursor.execute(f"PREPARE {name} AS {query}")
+        prepared.add(name)
+    if params:
+        cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+    else:
+        cursor.execute(f"EXECUTE {name}")
+
 def get_db_connection():
     """Get PostgreSQL connection from Railway environment variables."""
     global DB_AVAILABLE
@@ -185,7 +300,9 @@ def get_db_connection():
             DB_AVAILABLE = False
             return None
         
-        conn = psycopg2.connect(database_url)
+        conn = _checkout_idle_connection()
+        if conn is None:
+            conn = psycopg2.connect(database_url, connection_factory=_PooledConnection)
         DB_AVAILABLE = True
         return conn
     except Exception as e:
@@ -251,6 +368,22 @@ def init_database():
         except Exception as e:
             logger.debug(f"version_endpoint column check: {e}")
 
+        # Partial covering index for the per-version stats aggregation (only rows with a
+        # version_endpoint): the group key and the open_count filter both come from the index, so
+        # Postgres can answer it with an index-only scan. Supersedes the version_endpoint-only index.
+        try:
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_email_tracking_version_open ON email_tracking(version_endpoint, open_count) WHERE version_endpoint IS NOT NULL')
+            cursor.execute('DROP INDEX IF EXISTS idx_email_tracking_version_endpoint')
+        except Exception as e:
+            logger.debug(f"version_endpoint index check: {e}")
+
+        # Expression index for the already-sent dedup in check_if_email_already_sent, which matches
+        # on LOWER(recipient_email) and wants the most recent send first.
+        try:
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_email_tracking_recipient_lower_sent ON email_tracking(LOWER(recipient_email), sent_at DESC)')
+        except Exception as e:
+            logger.debug(f"recipient_email index check: {e}")
+
         # Remove old variant_endpoint column if it exists
         try:
             cursor.execute('ALTER TABLE email_tracking DROP COLUMN IF EXISTS variant_endpoint')
@@ -565,6 +698,8 @@ init_database()
 
 # Gmail API configuration
 SCOPES = ['https://www.googleapis.com/auth/gmail.readonly', 'https://www.googleapis.com/auth/gmail.send']
+GMAIL_INBOX_SCAN_LIMIT = 500  # Max inbox messages listed per reply run
+GMAIL_QUERY_MAX_ADDRESSES = 100  # Above this many account domains, matching is client-side only
 
 def authenticate_gmail():
     """Authenticate with Gmail API using environment variables or stored credentials."""
@@ -642,6 +777,24 @@ def authenticate_gmail():
     
     return creds
 
+def get_header_map(headers):
+    """Map header name -> value for a Gmail message in one pass (first occurrence wins, like next())."""
+    header_map = {}
+    for h in headers:
+        header_map.setdefault(h['name'], h['value'])
+    return header_map
+
+def build_gmail_service(creds):
+    """Build a Gmail API client from the bundled discovery document (no discovery HTTP call)."""
+    return build('gmail', 'v1', credentials=creds, cache_discovery=False, static_discovery=True)
+
+# Matches the address part of a "Name <email@domain.com>" header value
+_ANGLE_RE = re.compile(r'<([^>]+)>')
+
+# Any run of whitespace (including \r/\n), collapsed to a single space in email bodies
+_WHITESPACE_RE = re.compile(r'\s+')
+
+@functools.lru_cache(maxsize=4096)
 def normalize_email(email):
     """
     Normalize email address by removing Gmail aliases (+alias part).
@@ -650,21 +803,59 @@ def normalize_email(email):
     if not email:
         return email
     
-    email = email.lower().strip()
+    email = email.casefold().strip()
     
     # Extract email from "Name <email@domain.com>" format
-    if '<' in email and '>' in email:
-        email = email.split('<')[1].split('>')[0]
+    match = _ANGLE_RE.search(email)
+    if match:
+        email = match.group(1)
     
     # Remove Gmail aliases (everything after + and before @)
-    if '+' in email and '@' in email:
-        local_part, domain = email.split('@', 1)
+    local_part, at, domain = email.partition('@')
+    if at and '+' in local_part:
         # Remove everything after the + sign
-        local_part = local_part.split('+')[0]
-        email = f"{local_part}@{domain}"
+        email = f"{local_part.partition('+')[0]}@{domain}"
     
     return email
 
+@functools.lru_cache(maxsize=8192)
+def extract_email_from_header(header_value, preserve_case=False):
+    """Extract email address from header value (handles 'Name <email@domain.com>' format).
+
+    Returns casefolded for comparison unless preserve_case is True.
+    """
+    if not header_value:
+        return None
+    match = _ANGLE_RE.search(header_value)
+    email_addr = (match.group(1) if match else header_value).strip()
+    return email_addr if preserve_case else email_addr.casefold()
+
+def parse_email_list(header_value, preserve_original=False):
+    """Parse comma-separated email list and return a tuple of clean email addresses.
+
+    Args:
+        header_value: The header value to parse (string, or list of address strings)
+        preserve_original: If True, preserve original email format; if False, return lowercase
+
+    Returns:
+        Tuple of email addresses (cached - callers that need to mutate wrap with list())
+    """
+    if not header_value:
+        return ()
+    if not isinstance(header_value, str):
+        # Normalize list input so it shares the cache with the header string form
+        header_value = ','.join(header_value)
+    return _parse_email_list_cached(header_value, preserve_original)
+
+@functools.lru_cache(maxsize=8192)
+def _parse_email_list_cached(header_value, preserve_original):
+    clean_emails = []
+    for email_str in header_value.split(','):
+        email_clean = extract_email_from_header(email_str.strip(), preserve_original)
+        if email_clean:
+            clean_emails.append(email_clean)
+    return tuple(clean_emails)
+
 def strip_html_tags(html_content):
     """Strip HTML tags and convert to plain text, preserving line breaks."""
     import re
@@ -791,6 +982,15 @@ def remove_quoted_text(email_body):
     
     return '\n'.join(cleaned_lines).strip()
 
+def clean_history_body(body_text):
+    """Prepare a message body for conversation history: strip HTML and quoted/replied text."""
+    # Strip HTML from body if present to keep conversation history clean
+    if body_text and ('<' in body_text and '>' in body_text):
+        body_text = strip_html_tags(body_text)
+    
+    # Remove quoted/replied text to avoid duplication in conversation history
+    return remove_quoted_text(body_text)
+
 def extract_email_body(payload):
     """Extract the body of an email, handling both plain text and HTML."""
     body = ""
@@ -849,7 +1049,7 @@ def get_original_message_id(gmail_message_id):
         logger.error(f"❌ Error getting original Message-ID: {e}")
         return None
 
-def has_been_replied_to(email_id, service):
+def has_been_replied_to(email_id, service, thread_id=None):
     """
     Check if the LATEST message in the thread (that's still in INBOX) is from us (Jake Morgan).
     Only considers messages that are still in the inbox (not deleted/trashed).
@@ -860,13 +1060,14 @@ def has_been_replied_to(email_id, service):
     Returns False (can reply) if:
     - Latest message is NOT from Jake, OR
     - Latest message is from Jake but it's been 27+ hours
+    
+    Pass thread_id when it is already known to skip the message lookup.
     """
     try:
-        import time
-        
         # Get the thread ID for this email
-        email_data = service.users().messages().get(userId='me', id=email_id).execute()
-        thread_id = email_data.get('threadId')
+        if not thread_id:
+            email_data = service.users().messages().get(userId='me', id=email_id).execute()
+            thread_id = email_data.get('threadId')
         
         if not thread_id:
             return False
@@ -885,39 +1086,33 @@ def has_been_replied_to(email_id, service):
         # Also collect their internal dates for proper chronological sorting
         accessible_messages_with_dates = []
         for msg in messages:
-            try:
-                msg_data = service.users().messages().get(userId='me', id=msg['id']).execute()
-                labels = msg_data.get('labelIds', [])
-                # Include messages that are in INBOX or SENT (not in TRASH)
-                # This ensures we catch Jake's replies which go to SENT folder
-                if 'TRASH' not in labels and ('INBOX' in labels or 'SENT' in labels):
-                    internal_date = msg_data.get('internalDate', 0)
-                    headers = msg_data['payload'].get('headers', [])
-                    sender = next((h['value'] for h in headers if h['name'] == 'From'), 'Unknown')
-                    subject = next((h['value'] for h in headers if h['name'] == 'Subject'), 'No Subject')
-                    date_str = next((h['value'] for h in headers if h['name'] == 'Date'), '')
-                    
-                    # Convert internal_date to readable time
-                    import datetime
-                    readable_time = datetime.datetime.fromtimestamp(int(internal_date) / 1000).strftime('%Y-%m-%d %H:%M:%S') if internal_date else 'Unknown'
-                    
-                    location = 'SENT' if 'SENT' in labels else 'INBOX'
-                    accessible_messages_with_dates.append({
-                        'message': msg,
-                        'internal_date': int(internal_date) if internal_date else 0,
-                        'labels': labels,
-                        'sender': sender,
-                        'subject': subject,
-                        'date_str': date_str,
-                        'readable_time': readable_time,
-                        'location': location
-                    })
-                    
-                    logger.info(f"  📨 Message {msg['id']}: From={sender}, Time={readable_time}, Location={location}, Subject={subject[:50]}")
-            except Exception as e:
-                # If message was deleted, skip it
-                logger.debug(f"Message {msg['id']} not accessible (likely deleted): {e}")
-                continue
+            # threads().get() returns full message resources (labels, internalDate, headers)
+            labels = msg.get('labelIds', [])
+            # Include messages that are in INBOX or SENT (not in TRASH)
+            # This ensures we catch Jake's replies which go to SENT folder
+            if 'TRASH' not in labels and ('INBOX' in labels or 'SENT' in labels):
+                internal_date = msg.get('internalDate', 0)
+                headers = get_header_map(msg['payload'].get('headers', []))
+                sender = headers.get('From', 'Unknown')
+                subject = headers.get('Subject', 'No Subject')
+                date_str = headers.get('Date', '')
+                
+                # Convert internal_date to readable time
+                readable_time = datetime.datetime.fromtimestamp(int(internal_date) / 1000).strftime('%Y-%m-%d %H:%M:%S') if internal_date else 'Unknown'
+                
+                location = 'SENT' if 'SENT' in labels else 'INBOX'
+                accessible_messages_with_dates.append({
+                    'message': msg,
+                    'internal_date': int(internal_date) if internal_date else 0,
+                    'labels': labels,
+                    'sender': sender,
+                    'subject': subject,
+                    'date_str': date_str,
+                    'readable_time': readable_time,
+                    'location': location
+                })
+                
+                logger.info(f"  📨 Message {msg['id']}: From={sender}, Time={readable_time}, Location={location}, Subject={subject[:50]}")
         
         if not accessible_messages_with_dates:
             # No accessible messages, consider it as needing reply
@@ -927,7 +1122,7 @@ def has_been_replied_to(email_id, service):
         logger.info(f"📧 Found {len(accessible_messages_with_dates)} accessible messages (INBOX or SENT)")
         
         # Sort by internal date (chronological order) to get the actual latest message
-        accessible_messages_with_dates.sort(key=lambda x: x['internal_date'])
+        accessible_messages_with_dates.sort(key=operator.itemgetter('internal_date'))
         latest_message_data = accessible_messages_with_dates[-1]
         latest_message = latest_message_data['message']
         latest_internal_date = latest_message_data['internal_date']
@@ -942,10 +1137,8 @@ def has_been_replied_to(email_id, service):
         logger.info(f"  🕐 Time: {latest_readable_time} (internal_date: {latest_internal_date})")
         logger.info(f"  📍 Location: {latest_location}")
         
-        # Get full message data for the latest message
-        latest_msg_data = service.users().messages().get(userId='me', id=latest_message['id']).execute()
-        headers = latest_msg_data['payload'].get('headers', [])
-        sender = next((h['value'] for h in headers if h['name'] == 'From'), '')
+        # Latest message already has full message data from the thread fetch
+        sender = get_header_map(latest_message['payload'].get('headers', [])).get('From', '')
         
         # If message is in SENT folder, it's from us (Jake Morgan)
         # Also check the sender header for jake.morgan@affirm.com
@@ -2406,8 +2599,16 @@ def reply_to_emails_with_accounts(accounts, cohort_override=None, account_name=N
         cohort_override: Optional dict with cohort info from Workato to override automatic lookup
         account_name: Optional merchant name from Workato (contact_name or account_name)
     """
-    emails_needing_replies = get_emails_needing_replies_with_accounts(accounts)
+    # Authenticate and build the Gmail client once for the whole request
+    creds = authenticate_gmail()
+    service = build_gmail_service(creds)
+    
+    emails_needing_replies = get_emails_needing_replies_with_accounts(accounts, creds=creds, service=service)
     responses = []
+    
+    # Gmail message resources keyed by message id, filled from the thread fetches below
+    # so later lookups (e.g. the CC fallback) don't re-fetch the same message
+    _msg_cache = {}
 
     logger.info(f"🔍 Found {len(emails_needing_replies)} threads needing replies")
     
@@ -2480,9 +2681,6 @@ def reply_to_emails_with_accounts(accounts, cohort_override=None, account_name=N
         
         # Build full conversation history from the thread
         try:
-            creds = authenticate_gmail()
-            service = build('gmail', 'v1', credentials=creds)
-            
             # Get all messages in the thread to build full conversation history
             thread_data = service.users().threads().get(userId='me', id=thread_id).execute()
             thread_messages = thread_data.get('messages', [])
@@ -2493,25 +2691,24 @@ def reply_to_emails_with_accounts(accounts, cohort_override=None, account_name=N
             
             for msg in thread_messages:
                 try:
-                    msg_data = service.users().messages().get(userId='me', id=msg['id']).execute()
-                    headers = msg_data['payload'].get('headers', [])
-                    msg_sender = next((h['value'] for h in headers if h['name'] == 'From'), 'Unknown')
-                    msg_to = next((h['value'] for h in headers if h['name'] == 'To'), None)
-                    msg_subject = next((h['value'] for h in headers if h['name'] == 'Subject'), 'No Subject')
-                    msg_date = next((h['value'] for h in headers if h['name'] == 'Date'), '')
+                    # threads().get() already returns full message resources
+                    msg_data = _msg_cache.setdefault(msg['id'], msg)
+                    headers = get_header_map(msg_data['payload'].get('headers', []))
+                    msg_sender = headers.get('From', 'Unknown')
+                    msg_to = headers.get('To')
+                    msg_subject = headers.get('Subject', 'No Subject')
+                    msg_date = headers.get('Date', '')
                     msg_body = extract_email_body(msg_data['payload'])
                     
-                    # Get internal date for sorting
-                    internal_date = msg_data.get('internalDate', 0)
-                    
                     conversation_parts.append({
                         'sender': msg_sender,
                         'to': msg_to,
                         'subject': msg_subject,
                         'date': msg_date,
                         'body': msg_body,
-                        'internal_date': int(internal_date) if internal_date else 0,
-                        'cc': next((h['value'] for h in headers if h['name'] == 'Cc'), None),
+                        # Internal date (ms since epoch) converted once here for sorting
+                        'internal_date': int(msg_data.get('internalDate') or 0),
+                        'cc': headers.get('Cc'),
                         'message_id': msg['id']
                     })
                 except Exception as e:
@@ -2519,7 +2716,7 @@ def reply_to_emails_with_accounts(accounts, cohort_override=None, account_name=N
                     continue
             
             # Sort by internal date to get chronological order
-            conversation_parts.sort(key=lambda x: x['internal_date'])
+            conversation_parts.sort(key=operator.itemgetter('internal_date'))
             
             # Get participants from the LATEST message only (To + CC)
             # This ensures we only reply to people who were on the latest message
@@ -2528,59 +2725,13 @@ def reply_to_emails_with_accounts(accounts, cohort_override=None, account_name=N
             jake_email_normalized = normalize_email(jake_email)
             sender_email_normalized = normalize_email(contact_email)
             
-            def extract_email_from_header(header_value, preserve_case=False):
-                """Extract email address from header value (handles 'Name <email@domain.com>' format)."""
-                if not header_value:
-                    return None
-                if '<' in header_value and '>' in header_value:
-                    email = header_value.split('<')[1].split('>')[0].strip()
-                else:
-                    email = header_value.strip()
-                # Return lowercase for comparison, but we'll preserve original format in the list
-                return email.lower() if not preserve_case else email
-            
-            def parse_email_list(header_value, preserve_original=False):
-                """Parse comma-separated email list and return list of clean email addresses.
-                
-                Args:
-                    header_value: The header value to parse
-                    preserve_original: If True, preserve original email format; if False, return lowercase
-                
-                Returns:
-                    List of email addresses (lowercase if preserve_original=False, original format if True)
-                """
-                if not header_value:
-                    return []
-                if isinstance(header_value, str):
-                    email_list = [e.strip() for e in header_value.split(',') if e.strip()]
-                else:
-                    email_list = [e.strip() for e in header_value if e.strip()]
-                
-                clean_emails = []
-                for email_str in email_list:
-                    if preserve_original:
-                        # Extract email but keep original format
-                        if '<' in email_str and '>' in email_str:
-                            email_clean = email_str.split('<')[1].split('>')[0].strip()
-                        else:
-                            email_clean = email_str.strip()
-                    else:
-                        email_clean = extract_email_from_header(email_str)
-                    if email_clean:
-                        clean_emails.append(email_clean)
-                return clean_emails
-            
             if conversation_parts:
                 latest_message = conversation_parts[-1]  # Last message is the latest
                 
                 # Get the sender of the latest message (this is who we're replying to)
                 latest_sender = latest_message.get('sender', '')
                 # Extract email from "Name <email@example.com>" format
-                latest_sender_email = latest_sender
-                if '<' in latest_sender and '>' in latest_sender:
-                    latest_sender_email = latest_sender.split('<')[1].split('>')[0].strip()
-                elif '@' in latest_sender:
-                    latest_sender_email = latest_sender.strip()
+                latest_sender_email = extract_email_from_header(latest_sender, preserve_case=True) or latest_sender
                 latest_sender_normalized = normalize_email(latest_sender_email) if latest_sender_email else ''
                 logger.info(f"📧 Latest message sender: {latest_sender} -> email: {latest_sender_email} (normalized: {latest_sender_normalized})")
                 
@@ -2639,25 +2790,15 @@ def reply_to_emails_with_accounts(accounts, cohort_override=None, account_name=N
                     cc_recipients = None
                     logger.info(f"📧 No additional participants from latest message (only primary sender)")
             
-            # Build conversation history string
-            conversation_history_lines = []
-            for i, msg_part in enumerate(conversation_parts, 1):
-                # Strip HTML from body if present to keep conversation history clean
-                body_text = msg_part['body']
-                if body_text and ('<' in body_text and '>' in body_text):
-                    body_text = strip_html_tags(body_text)
-                
-                # Remove quoted/replied text to avoid duplication in conversation history
-                body_text = remove_quoted_text(body_text)
-                
-                conversation_history_lines.append(f"--- Message {i} ---")
-                conversation_history_lines.append(f"From: {msg_part['sender']}")
-                conversation_history_lines.append(f"Date: {msg_part['date']}")
-                conversation_history_lines.append(f"Subject: {msg_part['subject']}")
-                conversation_history_lines.append(f"Body:\n{body_text}")
-                conversation_history_lines.append("")
-            
-            conversation_content = "\n".join(conversation_history_lines)
+            # Build conversation history string (one formatted block per message, single join)
+            conversation_content = "\n".join(
+                f"--- Message {i} ---\n"
+                f"From: {msg_part['sender']}\n"
+                f"Date: {msg_part['date']}\n"
+                f"Subject: {msg_part['subject']}\n"
+                f"Body:\n{clean_history_body(msg_part['body'])}\n"
+                for i, msg_part in enumerate(conversation_parts, 1)
+            )
             logger.info(f"📧 Built conversation history with {len(conversation_parts)} messages for thread {thread_id}")
             
         except Exception as e:
@@ -2681,12 +2822,10 @@ def reply_to_emails_with_accounts(accounts, cohort_override=None, account_name=N
         # If we don't have cc_recipients yet, try to get it from the original email
         if not cc_recipients:
             try:
-                creds = authenticate_gmail()
-                service = build('gmail', 'v1', credentials=creds)
-                original_msg_data = service.users().messages().get(userId='me', id=email['id']).execute()
-                original_headers = original_msg_data['payload'].get('headers', [])
-                original_to = next((h['value'] for h in original_headers if h['name'] == 'To'), None)
-                original_cc = next((h['value'] for h in original_headers if h['name'] == 'Cc'), None)
+                # The original email was fetched with its thread when building the history
+                original_headers = get_header_map(_msg_cache[email['id']]['payload'].get('headers', []))
+                original_to = original_headers.get('To')
+                original_cc = original_headers.get('Cc')
                 
                 logger.info(f"📧 Fallback: Original email To: {original_to}")
                 logger.info(f"📧 Fallback: Original email CC: {original_cc}")
@@ -2897,11 +3036,7 @@ def reply_to_emails_with_accounts(accounts, cohort_override=None, account_name=N
                     
                     # Check if this message is from Jake Morgan (check sender email or name)
                     # Extract email from sender field if it's in "Name <email>" format
-                    sender_email = None
-                    if '<' in msg_part.get('sender', '') and '>' in msg_part.get('sender', ''):
-                        sender_email = msg_part.get('sender', '').split('<')[1].split('>')[0].strip().lower()
-                    else:
-                        sender_email = msg_part.get('sender', '').strip().lower()
+                    sender_email = extract_email_from_header(msg_part.get('sender', ''))
                     
                     is_from_jake = (jake_email in msg_sender or 
                                    'jake' in msg_sender or 
@@ -3212,19 +3347,68 @@ def reply_to_emails_with_accounts(accounts, cohort_override=None, account_name=N
         "responses": responses
     }
 
-def get_emails_needing_replies_with_accounts(accounts):
-    """Get emails needing replies using accounts provided by Workato instead of Salesforce query."""
-    creds = authenticate_gmail()
-    service = build('gmail', 'v1', credentials=creds)
+# Per-thread outcome log lines (%-templates), indexed as:
+#   0/1 - needs a reply, last message from a CC'd participant / the merchant (index = is_from_merchant)
+#   2   - no reply required
+#   3   - already has a reply
+_THREAD_OUTCOME_LOG_TEMPLATES = (
+    "Conversation thread %s from %s needs a reply (last message from CC'd participant, normalized: %s)",
+    "Conversation thread %s from %s needs a reply (last message from merchant, normalized: %s)",
+    "Conversation thread %s - latest message doesn't require reply (is_from_merchant=%s, latest_sender_was_ccd=%s, thread_has_account_recipient=%s, latest_message_is_from_us=%s, merchanthelp_has_responded=%s)",
+    "Conversation thread %s from %s already has a reply",
+)
+
+def get_emails_needing_replies_with_accounts(accounts, creds=None, service=None):
+    """Get emails needing replies using accounts provided by Workato instead of Salesforce query.
+
+    Callers that already hold Gmail credentials / a service can pass them in to avoid
+    re-authenticating and rebuilding the client.
+    """
+    if creds is None:
+        creds = authenticate_gmail()
+    if service is None:
+        service = build_gmail_service(creds)
 
     logger.info("Connected to Gmail API")
 
+    # Cache of Gmail message resources keyed by message id so the same message
+    # is only fetched once per run (inbox scan, thread scan, CC checks, etc.)
+    _msg_cache = {}
+
+    # The Gmail client's httplib2 transport is not thread-safe, so each worker
+    # thread gets its own service object (build() uses the bundled discovery doc)
+    _thread_local = threading.local()
+    _owner_thread = threading.current_thread()
+
+    def _service():
+        """Return the Gmail service for the current thread."""
+        if threading.current_thread() is _owner_thread:
+            return service
+        if not hasattr(_thread_local, 'service'):
+            _thread_local.service = build_gmail_service(creds)
+        return _thread_local.service
+
+    def _get(msg_id):
+        """Fetch a Gmail message, returning the cached copy if already fetched."""
+        if msg_id not in _msg_cache:
+            _msg_cache[msg_id] = _service().users().messages().get(userId='me', id=msg_id).execute()
+        return _msg_cache[msg_id]
+
+    # has_been_replied_to() results for this run, keyed by message id
+    reply_cache = {}
+
+    def _replied(msg_id, thread_id=None):
+        """Memoized has_been_replied_to() for this run."""
+        if msg_id not in reply_cache:
+            reply_cache[msg_id] = has_been_replied_to(msg_id, _service(), thread_id=thread_id)
+        return reply_cache[msg_id]
+
     # Create a lookup dictionary for email addresses from Workato accounts
     # Store both original and normalized versions for matching
     account_emails = {}
     normalized_account_emails = {}  # Maps normalized email -> account info
     for account in accounts:
-        email_addr = account.get('email', '').lower().strip()
+        email_addr = account.get('email', '').casefold().strip()
         if email_addr:
             normalized = normalize_email(email_addr)
             account_emails[email_addr] = {
@@ -3236,6 +3420,11 @@ def get_emails_needing_replies_with_accounts(accounts):
             # Store normalized version for alias matching
             normalized_account_emails[normalized] = account_emails[email_addr]
 
+    # Set views of the lookups for O(1) membership checks
+    account_email_set = set(account_emails)
+    normalized_set = set(normalized_account_emails)
+    all_known_emails = account_email_set | normalized_set
+
     logger.info(f"Processing {len(account_emails)} email addresses from Workato")
     logger.info(f"Normalized email lookup: {list(normalized_account_emails.keys())}")
 
@@ -3246,299 +3435,225 @@ def get_emails_needing_replies_with_accounts(accounts):
     
     # Fetch emails from inbox from the last 24 hours only
     query = f'after:{twenty_four_hours_ago_ms // 1000}'
+    
+    # Let Gmail's index narrow the listing to messages from/to/cc a Workato account's domain,
+    # so unrelated inbox traffic is never fetched. Filtering on the domain rather than the exact
+    # address keeps plus-alias variants (name+tag@domain), which Gmail's address search does not
+    # reliably return, for the normalize_email() match below. Skipped for very large domain
+    # lists to keep the query string a sane length.
+    account_domains = sorted({addr.rpartition('@')[2] for addr in all_known_emails if '@' in addr})
+    if 0 < len(account_domains) <= GMAIL_QUERY_MAX_ADDRESSES:
+        domain_group = ' OR '.join(account_domains)
+        query += f' (from:({domain_group}) OR to:({domain_group}) OR cc:({domain_group}))'
     logger.info(f"🔍 Searching for emails in INBOX from last 24 hours (after {datetime.datetime.fromtimestamp(twenty_four_hours_ago_ms / 1000)})")
     
-    results = service.users().messages().list(
-        userId='me',
-        labelIds=['INBOX'],
-        q=query,  # Apply the 24-hour filter here
-        maxResults=100
-    ).execute()
-    messages = results.get('messages', [])
+    # Page through matches, stopping once the safety cap is reached
+    messages = []
+    page_token = None
+    while len(messages) < GMAIL_INBOX_SCAN_LIMIT:
+        results = service.users().messages().list(
+            userId='me',
+            labelIds=['INBOX'],
+            q=query,  # Apply the 24-hour + account filter here
+            maxResults=min(100, GMAIL_INBOX_SCAN_LIMIT - len(messages)),
+            pageToken=page_token
+        ).execute()
+        messages.extend(results.get('messages', []))
+        page_token = results.get('nextPageToken')
+        if not page_token:
+            break
     if not messages:
         logger.warning("No emails found in inbox from last 24 hours!")
         return []
 
     logger.info(f"Found {len(messages)} total emails in inbox from last 24 hours")
 
-    emails = []
-    for msg in messages:
-        msg_id = msg['id']
-        message = service.users().messages().get(userId='me', id=msg_id).execute()
-        
-        # Extract email details
-        headers = message['payload'].get('headers', [])
-        sender = next((h['value'] for h in headers if h['name'] == 'From'), '')
-        subject = next((h['value'] for h in headers if h['name'] == 'Subject'), '')
-        date = next((h['value'] for h in headers if h['name'] == 'Date'), '')
-        message_id = next((h['value'] for h in headers if h['name'] == 'Message-ID'), '')
-        thread_id = message.get('threadId')
-        
-        # Extract and normalize sender email address
-        sender_email = normalize_email(sender)
-        sender_email_original = sender.lower()
-        if '<' in sender_email_original and '>' in sender_email_original:
-            sender_email_original = sender_email_original.split('<')[1].split('>')[0]
-        
-        # Check if this email is from one of the Workato-provided accounts
-        # Check both exact match and normalized match (for alias handling)
-        account_info = None
-        if sender_email_original in account_emails:
-            account_info = account_emails[sender_email_original]
-        elif sender_email in normalized_account_emails:
-            account_info = normalized_account_emails[sender_email]
-            logger.info(f"📧 Matched email alias: {sender_email_original} -> {sender_email} (normalized)")
-        
-        if account_info:
-            # Get email body
-            body = extract_email_body(message['payload'])
+    # Only thread ids are needed from the listing - one threads().get() per unique
+    # thread returns every message (headers + body) so individual inbox messages
+    # don't have to be fetched and then re-expanded
+    inbox_message_ids = {msg['id'] for msg in messages}
+    unique_thread_ids = list({msg['threadId'] for msg in messages if msg.get('threadId')})
+    logger.info(f"Found {len(unique_thread_ids)} unique threads in inbox from last 24 hours")
+
+    # Fetch all threads with batched requests (Gmail allows up to 100 calls per batch,
+    # 50 keeps us clear of per-user rate limits)
+    thread_results = {}
+    
+    def _on_thread_fetched(request_id, response, exception):
+        if exception is not None:
+            logger.warning(f"⚠️ Error processing thread {request_id}: {exception}")
+            return
+        thread_results[request_id] = response
+    
+    for i in range(0, len(unique_thread_ids), 50):
+        batch = service.new_batch_http_request(callback=_on_thread_fetched)
+        for thread_id in unique_thread_ids[i:i + 50]:
+            batch.add(service.users().threads().get(userId='me', id=thread_id), request_id=thread_id)
+        batch.execute()
+    
+    # Single pass over every thread message:
+    # - collect thread emails for the reply decision
+    # - find threads with an inbox email FROM a Workato account
+    # - find threads where a Workato account is a recipient (To/CC) of an inbox email,
+    #   so we can reply to threads where the latest message is from a CC'd participant
+    thread_ids_from_emails = set()
+    thread_ids_with_account_recipients = set()
+    thread_recipients = defaultdict(set)  # thread_id -> recipient emails of its inbox messages
+    all_thread_emails = {}
+    for thread_id, thread_data in thread_results.items():
+        thread_entries = []
+        for message in thread_data.get('messages', []):
+            msg_id = message['id']
+            _msg_cache.setdefault(msg_id, message)
             
-            # Skip Salesforce case notification emails
-            if is_salesforce_case_notification(body, subject):
-                logger.info(f"⏭️ Skipping Salesforce case notification email from {sender} - {subject}")
-                continue
+            headers = get_header_map(message['payload'].get('headers', []))
+            sender = headers.get('From', '')
+            subject = headers.get('Subject', '')
+            date = headers.get('Date', '')
+            to_header = headers.get('To', '')
+            cc_header = headers.get('Cc', '')
+            
+            sender_normalized = normalize_email(sender)
+            sender_original = extract_email_from_header(sender) or ''
+            
+            # Check if this message is from one of our accounts (exact or normalized)
+            account_info = None
+            if sender_original in account_emails:
+                account_info = account_emails[sender_original]
+            elif sender_normalized in normalized_account_emails:
+                account_info = normalized_account_emails[sender_normalized]
+                logger.info(f"📧 Found alias match in thread {thread_id}: {sender_original} -> {sender_normalized}")
+            is_from_account = account_info is not None
+            
+            body = extract_email_body(message['payload'])
             
             # Get internalDate for proper chronological sorting
             internal_date = message.get('internalDate', 0)
             
-            email_data = {
+            thread_entries.append({
                 'id': msg_id,
                 'threadId': thread_id,
                 'sender': sender,
                 'subject': subject,
-                'body': body,
                 'date': date,
                 'internal_date': int(internal_date) if internal_date else 0,
-                'message_id': message_id,
-                'contact_name': account_info['contact_name'],
-                'account_id': account_info['account_id'],
-                'contact_id': account_info['contact_id'],
-                'normalized_sender': sender_email  # Store normalized for thread matching
-            }
-            emails.append(email_data)
-            logger.info(f"Found email from Workato account: {sender} (normalized: {sender_email}) - {subject}")
-
-    logger.info(f"Found {len(emails)} emails from Workato-provided accounts")
-
-    # Also check threads that contain emails from our accounts (even if latest email doesn't match)
-    # This handles cases where original email was from alias, but reply is from base email
-    thread_ids_from_emails = {email.get('threadId') for email in emails if email.get('threadId')}
-    
-    # Also find threads where Workato accounts appear in To or CC (not just From)
-    # This allows us to reply to threads where the latest message is from a CC'd participant
-    logger.info("🔍 Scanning inbox for threads where Workato accounts are recipients (To/CC)...")
-    thread_ids_with_account_recipients = set()
-    
-    def extract_email_from_header(header_value):
-        """Extract email address from header value (handles 'Name <email@domain.com>' format)."""
-        if not header_value:
-            return None
-        if '<' in header_value and '>' in header_value:
-            return header_value.split('<')[1].split('>')[0].strip().lower()
-        return header_value.strip().lower()
-    
-    def parse_email_list(header_value):
-        """Parse comma-separated email list and return list of clean email addresses."""
-        if not header_value:
-            return []
-        if isinstance(header_value, str):
-            email_list = [e.strip() for e in header_value.split(',') if e.strip()]
-        else:
-            email_list = [e.strip() for e in header_value if e.strip()]
-        
-        clean_emails = []
-        for email_str in email_list:
-            email_clean = extract_email_from_header(email_str)
-            if email_clean:
-                clean_emails.append(email_clean)
-        return clean_emails
-    
-    # Scan all inbox messages to find threads where Workato accounts are in To/CC
-    for msg in messages:
-        try:
-            msg_id = msg['id']
-            message = service.users().messages().get(userId='me', id=msg_id).execute()
-            thread_id = message.get('threadId')
-            if not thread_id:
-                continue
+                'body': body,
+                'to': to_header,
+                'cc': cc_header,
+                'is_from_account': is_from_account,
+                'account_info': account_info,
+                'normalized_sender': sender_normalized
+            })
             
-            headers = message['payload'].get('headers', [])
-            to_header = next((h['value'] for h in headers if h['name'] == 'To'), '')
-            cc_header = next((h['value'] for h in headers if h['name'] == 'Cc'), '')
+            # Thread relevance is decided by the inbox messages matched by the 24-hour query
+            if msg_id not in inbox_message_ids:
+                continue
             
-            # Check if any Workato account is in To or CC
-            to_emails = parse_email_list(to_header)
-            cc_emails = parse_email_list(cc_header)
-            all_recipients = set(to_emails + cc_emails)
+            if is_from_account:
+                if is_salesforce_case_notification(body, subject):
+                    logger.info(f"⏭️ Skipping Salesforce case notification email from {sender} - {subject}")
+                else:
+                    thread_ids_from_emails.add(thread_id)
+                    logger.info(f"Found email from Workato account: {sender} (normalized: {sender_normalized}) - {subject}")
             
-            # Check if any recipient matches a Workato account
-            for recipient in all_recipients:
-                recipient_normalized = normalize_email(recipient)
-                if recipient in account_emails or recipient_normalized in normalized_account_emails:
-                    thread_ids_with_account_recipients.add(thread_id)
-                    logger.info(f"📧 Found thread {thread_id} where Workato account {recipient} is a recipient")
-                    break
-        except Exception as e:
-            logger.debug(f"Error checking message {msg.get('id', 'unknown')} for recipient match: {e}")
-            continue
+            # Index recipients (original + normalized for alias matching) per thread
+            for recipient in parse_email_list(to_header) + parse_email_list(cc_header):
+                thread_recipients[thread_id].add(recipient)
+                thread_recipients[thread_id].add(normalize_email(recipient))
+        
+        all_thread_emails[thread_id] = thread_entries
+    
+    # One set intersection per thread against every known account address
+    for thread_id, recipients in thread_recipients.items():
+        matched_accounts = recipients & all_known_emails
+        if matched_accounts:
+            thread_ids_with_account_recipients.add(thread_id)
+            logger.info(f"📧 Found thread {thread_id} where Workato account(s) {sorted(matched_accounts)} are recipients")
     
     # Combine thread IDs: those with emails from accounts + those with accounts as recipients
     all_relevant_thread_ids = thread_ids_from_emails | thread_ids_with_account_recipients
     logger.info(f"📊 Found {len(thread_ids_from_emails)} threads with emails from accounts, {len(thread_ids_with_account_recipients)} threads with accounts as recipients, {len(all_relevant_thread_ids)} total unique threads")
     
-    # For each thread that has at least one email from our accounts OR has our accounts as recipients, check ALL messages in thread
-    all_thread_emails = {}
-    for thread_id in all_relevant_thread_ids:
-        try:
-            thread_data = service.users().threads().get(userId='me', id=thread_id).execute()
-            thread_messages = thread_data.get('messages', [])
-            
-            for msg in thread_messages:
-                msg_id = msg['id']
-                message = service.users().messages().get(userId='me', id=msg_id).execute()
-                
-                headers = message['payload'].get('headers', [])
-                sender = next((h['value'] for h in headers if h['name'] == 'From'), '')
-                subject = next((h['value'] for h in headers if h['name'] == 'Subject'), '')
-                date = next((h['value'] for h in headers if h['name'] == 'Date'), '')
-                
-                sender_normalized = normalize_email(sender)
-                
-                # Check if this message is from one of our accounts (exact or normalized)
-                is_from_account = False
-                account_info = None
-                
-                sender_original = sender.lower()
-                if '<' in sender_original and '>' in sender_original:
-                    sender_original = sender_original.split('<')[1].split('>')[0]
-                
-                if sender_original in account_emails:
-                    account_info = account_emails[sender_original]
-                    is_from_account = True
-                elif sender_normalized in normalized_account_emails:
-                    account_info = normalized_account_emails[sender_normalized]
-                    is_from_account = True
-                    logger.info(f"📧 Found alias match in thread {thread_id}: {sender_original} -> {sender_normalized}")
-                
-                if thread_id not in all_thread_emails:
-                    all_thread_emails[thread_id] = []
-                
-                # Get internalDate for proper chronological sorting
-                internal_date = message.get('internalDate', 0)
-                
-                all_thread_emails[thread_id].append({
-                    'id': msg_id,
-                    'threadId': thread_id,
-                    'sender': sender,
-                    'subject': subject,
-                    'date': date,
-                    'internal_date': int(internal_date) if internal_date else 0,
-                    'body': extract_email_body(message['payload']),
-                    'is_from_account': is_from_account,
-                    'account_info': account_info,
-                    'normalized_sender': sender_normalized
-                })
-        except Exception as e:
-            logger.warning(f"⚠️ Error processing thread {thread_id}: {e}")
-            # Fall back to emails we already found
-            if thread_id not in all_thread_emails:
-                all_thread_emails[thread_id] = []
-    for email in emails:
-                    if email.get('threadId') == thread_id:
-                        email['is_from_account'] = True
-                        all_thread_emails[thread_id].append(email)
+    # Only threads with at least one email from our accounts OR our accounts as recipients are considered
+    all_thread_emails = {thread_id: all_thread_emails[thread_id] for thread_id in all_relevant_thread_ids}
 
     # Group emails by conversation thread (threadId)
     thread_emails = all_thread_emails
     
-    emails_needing_replies = []
+    # f-strings are evaluated before logger.info() checks the level, so the per-thread
+    # log lines below are guarded explicitly
+    info_enabled = logger.isEnabledFor(logging.INFO)
+    info = logger.info  # bound once - decide_thread logs several lines per thread
     
     # Check each conversation thread - reply if:
     # 1. Last message is from merchant (not from us), OR
     # 2. Last message is from a CC'd participant and a Workato account is involved in the thread
-    for thread_id, emails_in_thread in thread_emails.items():
+    def decide_thread(item):
+        """Decide whether a conversation thread needs a reply.
+
+        Returns (reply email dict or None, outcome log line or None). Outcome lines are
+        collected and logged together once all threads are decided.
+        """
+        thread_id, emails_in_thread = item
+
         # Sort emails by internalDate (chronological order) to get the actual latest one
-        emails_in_thread.sort(key=lambda x: x.get('internal_date', 0))
+        emails_in_thread.sort(key=operator.itemgetter('internal_date'))
         latest_email = emails_in_thread[-1]  # Most recent email in this thread (by internalDate)
+        sender = latest_email.get('sender', '')
         
         # Only process threads where the latest message is from the last 24 hours
         latest_internal_date = latest_email.get('internal_date', 0)
         if latest_internal_date < twenty_four_hours_ago_ms:
-            logger.info(f"⏭️ Skipping thread {thread_id} - latest message is older than 24 hours (internal_date: {latest_internal_date}, 24h ago: {twenty_four_hours_ago_ms})")
-            continue
+            info("⏭️ Skipping thread %s - latest message is older than 24 hours (internal_date: %s, 24h ago: %s)", thread_id, latest_internal_date, twenty_four_hours_ago_ms)
+            return None, None
         
         # Skip Salesforce case notification emails
         latest_body = latest_email.get('body', '')
         latest_subject = latest_email.get('subject', '')
         if is_salesforce_case_notification(latest_body, latest_subject):
-            logger.info(f"⏭️ Skipping Salesforce case notification email in thread {thread_id} - {latest_subject}")
-            continue
+            info("⏭️ Skipping Salesforce case notification email in thread %s - %s", thread_id, latest_subject)
+            return None, None
         
         # Get full message data to check To/CC headers and sender
+        # (the From header is more reliable than the stored sender)
         latest_msg_data = None
         try:
-            latest_msg_data = service.users().messages().get(userId='me', id=latest_email['id']).execute()
-            latest_headers = latest_msg_data['payload'].get('headers', [])
-            latest_to = next((h['value'] for h in latest_headers if h['name'] == 'To'), '')
-            latest_cc = next((h['value'] for h in latest_headers if h['name'] == 'Cc'), '')
+            latest_msg_data = _get(latest_email['id'])
+            latest_headers = get_header_map(latest_msg_data['payload'].get('headers', []))
+            latest_to = latest_headers.get('To', '')
+            latest_cc = latest_headers.get('Cc', '')
+            latest_sender_header = latest_headers.get('From', sender)
         except Exception as e:
             logger.warning(f"⚠️ Error getting headers for latest message in thread {thread_id}: {e}")
             latest_to = ''
             latest_cc = ''
+            latest_sender_header = sender
             latest_msg_data = None
         
         # Check if any Workato account is involved in this thread (in any message's To/CC)
         thread_has_account_recipient = thread_id in thread_ids_with_account_recipients
         
-        # Extract sender from the latest message headers (more reliable than stored data)
-        latest_sender_header = ''
-        try:
-            if latest_msg_data is None:
-                latest_msg_data = service.users().messages().get(userId='me', id=latest_email['id']).execute()
-            latest_headers = latest_msg_data['payload'].get('headers', [])
-            latest_sender_header = next((h['value'] for h in latest_headers if h['name'] == 'From'), latest_email.get('sender', ''))
-        except Exception as e:
-            logger.debug(f"Could not extract From header for latest message: {e}")
-            latest_sender_header = latest_email.get('sender', '')
-        
         # Normalize the sender email
-        latest_sender = latest_sender_header.lower()
         latest_sender_normalized = normalize_email(latest_sender_header)
-        latest_sender_original = latest_sender
-        if '<' in latest_sender_original and '>' in latest_sender_original:
-            latest_sender_original = latest_sender_original.split('<')[1].split('>')[0].strip().lower()
-        elif '@' in latest_sender_original:
-            latest_sender_original = latest_sender_original.strip().lower()
+        latest_sender_original = extract_email_from_header(latest_sender_header) or ''
         
-        logger.info(f"📧 Thread {thread_id}: Latest sender extracted - original: '{latest_sender_original}', normalized: '{latest_sender_normalized}', header: '{latest_sender_header[:50]}'")
+        if info_enabled:
+            info("📧 Thread %s: Latest sender extracted - original: '%s', normalized: '%s', header: '%.50s'", thread_id, latest_sender_original, latest_sender_normalized, latest_sender_header)
         
         # Check if latest sender was CC'd in any previous message in this thread
         latest_sender_was_ccd = False
         if thread_has_account_recipient:
             # Check all previous messages (not the latest) to see if latest sender was CC'd
-            for prev_email in emails_in_thread[1:]:  # Skip latest email
-                try:
-                    prev_msg_data = service.users().messages().get(userId='me', id=prev_email['id']).execute()
-                    prev_headers = prev_msg_data['payload'].get('headers', [])
-                    prev_cc = next((h['value'] for h in prev_headers if h['name'] == 'Cc'), '')
-                    prev_cc_emails = parse_email_list(prev_cc)
-                    
-                    # Check if latest sender was in CC of this previous message
-                    for cc_email in prev_cc_emails:
-                        cc_normalized = normalize_email(cc_email)
-                        if (cc_email == latest_sender_original or 
-                            cc_normalized == latest_sender_normalized or
-                            latest_sender_original in cc_email or
-                            latest_sender_normalized in cc_normalized):
-                            latest_sender_was_ccd = True
-                            logger.info(f"📧 Thread {thread_id}: Latest sender {latest_sender_original} was CC'd in previous message")
-                            break
-                    
-                    if latest_sender_was_ccd:
-                        break
-                except Exception as e:
-                    logger.debug(f"Error checking CC in previous message: {e}")
-                    continue
+            # CC headers were captured when the thread was collected - no extra fetches needed.
+            # Compare normalized addresses only - substring checks gave false positives
+            # (e.g. a@b.com matching aa@b.com). any() stops at the first hit.
+            prev_cc_sets = (
+                {normalize_email(cc_email) for cc_email in parse_email_list(prev_email.get('cc', ''))}
+                for prev_email in emails_in_thread[:-1]  # Skip latest email (list is sorted oldest -> newest)
+            )
+            latest_sender_was_ccd = any(latest_sender_normalized in prev_cc_set for prev_cc_set in prev_cc_sets)
+            if latest_sender_was_ccd:
+                info("📧 Thread %s: Latest sender %s was CC'd in previous message", thread_id, latest_sender_original)
         
         # Ensure latest_email has account_info if it's from one of our accounts
         if latest_email.get('account_info'):
@@ -3556,40 +3671,30 @@ def get_emails_needing_replies_with_accounts(accounts):
         
         # Check if latest sender is one of our Workato accounts (merchant)
         # Check both exact match and normalized match
-        logger.info(f"🔍 Checking if sender is merchant - account_emails keys: {list(account_emails.keys())[:5]}..., normalized_account_emails keys: {list(normalized_account_emails.keys())[:5]}...")
+        if info_enabled:
+            info("🔍 Checking if sender is merchant - account_emails keys: %s..., normalized_account_emails keys: %s...", list(account_emails)[:5], list(normalized_account_emails)[:5])
         
-        if latest_sender_normalized in normalized_account_emails:
+        # Aliases are covered by the normalized set, so no substring matching is needed
+        if latest_sender_normalized in normalized_set:
             is_from_merchant = True
-            logger.info(f"✅ Matched merchant by normalized email: {latest_sender_normalized}")
-        elif latest_sender_original in account_emails:
+            info("✅ Matched merchant by normalized email: %s", latest_sender_normalized)
+        elif latest_sender_original in account_email_set:
             is_from_merchant = True
-            logger.info(f"✅ Matched merchant by original email: {latest_sender_original}")
-        else:
-            # Also check if any part of the sender string matches (for aliases)
-            for account_email, account_data in account_emails.items():
-                normalized_account = account_data.get('normalized_email', normalize_email(account_email))
-                # Check if the account email or normalized account matches
-                if (account_email.lower() == latest_sender_original or 
-                    normalized_account == latest_sender_normalized or
-                    account_email.lower() in latest_sender_header.lower() or
-                    normalized_account in latest_sender_normalized):
-                    is_from_merchant = True
-                    logger.info(f"✅ Matched merchant by alias/partial match: account={account_email}, normalized={normalized_account}, sender={latest_sender_original}")
-                break
+            info("✅ Matched merchant by original email: %s", latest_sender_original)
         
         if not is_from_merchant:
-            logger.info(f"❌ Sender '{latest_sender_original}' (normalized: '{latest_sender_normalized}') is NOT a merchant account")
+            info("❌ Sender '%s' (normalized: '%s') is NOT a merchant account", latest_sender_original, latest_sender_normalized)
         
         # Check if latest message is from us (in SENT folder) - if so, skip entirely
         # We should never reply to our own messages, regardless of the 27-hour rule
         latest_message_is_from_us = False
         try:
             if latest_msg_data is None:
-                latest_msg_data = service.users().messages().get(userId='me', id=latest_email['id']).execute()
+                latest_msg_data = _get(latest_email['id'])
             latest_msg_labels = latest_msg_data.get('labelIds', [])
             if 'SENT' in latest_msg_labels:
                 latest_message_is_from_us = True
-                logger.info(f"⏭️ Skipping thread {thread_id} - latest message is in SENT folder (from us), will not reply to our own message")
+                info("⏭️ Skipping thread %s - latest message is in SENT folder (from us), will not reply to our own message", thread_id)
         except Exception as e:
             logger.debug(f"Could not check message labels for {latest_email['id']}: {e}")
         
@@ -3599,24 +3704,17 @@ def get_emails_needing_replies_with_accounts(accounts):
         try:
             for email_in_thread in emails_in_thread:
                 try:
-                    msg_data = service.users().messages().get(userId='me', id=email_in_thread['id']).execute()
-                    headers = msg_data['payload'].get('headers', [])
-                    from_header = next((h['value'] for h in headers if h['name'] == 'From'), '')
+                    msg_data = _get(email_in_thread['id'])
+                    from_header = get_header_map(msg_data['payload'].get('headers', [])).get('From', '')
                     
                     # Check if sender is merchanthelp (case-insensitive, handle "Name <email>" format)
-                    from_email = from_header.lower()
-                    
-                    # Extract email from "Name <email>" format if present
-                    if '<' in from_email and '>' in from_email:
-                        extracted_email = from_email.split('<')[1].split('>')[0].strip()
-                    else:
-                        extracted_email = from_email.strip()
+                    extracted_email = extract_email_from_header(from_header) or ''
                     
                     # Check if extracted email matches any merchanthelp email address
                     for merchanthelp_email in merchanthelp_emails:
                         if merchanthelp_email.lower() in extracted_email or extracted_email == merchanthelp_email.lower():
                             merchanthelp_has_responded = True
-                            logger.info(f"⏭️ Skipping thread {thread_id} - {merchanthelp_email} has already responded in this thread (message from: {from_header})")
+                            info("⏭️ Skipping thread %s - %s has already responded in this thread (message from: %s)", thread_id, merchanthelp_email, from_header)
                             break
                     
                     if merchanthelp_has_responded:
@@ -3634,14 +3732,24 @@ def get_emails_needing_replies_with_accounts(accounts):
         # AND NOT if merchanthelp@affirm.com has already responded
         should_reply = (is_from_merchant or (latest_sender_was_ccd and thread_has_account_recipient)) and not latest_message_is_from_us and not merchanthelp_has_responded
         
+        # Bail out before the reply-status lookup (Gmail calls) when no reply is needed
+        if not should_reply:
+            outcome = None
+            if info_enabled:
+                outcome = _THREAD_OUTCOME_LOG_TEMPLATES[2] % (
+                    thread_id, is_from_merchant, latest_sender_was_ccd, thread_has_account_recipient, latest_message_is_from_us, merchanthelp_has_responded)
+            return None, outcome
+        
         # Only reply if:
         # 1. Latest message is from merchant OR from a CC'd participant (and thread has account recipient)
         # 2. Latest message is NOT from us (not in SENT folder)
         # 3. Thread hasn't been replied to yet
-        has_been_replied = has_been_replied_to(latest_email['id'], service)
-        logger.info(f"🔍 Thread {thread_id} decision: is_from_merchant={is_from_merchant}, latest_sender_was_ccd={latest_sender_was_ccd}, thread_has_account_recipient={thread_has_account_recipient}, latest_message_is_from_us={latest_message_is_from_us}, merchanthelp_has_responded={merchanthelp_has_responded}, should_reply={should_reply}, has_been_replied={has_been_replied}, latest_sender={latest_sender_normalized}")
+        has_been_replied = _replied(latest_email['id'], thread_id)
+        if info_enabled:
+            info("🔍 Thread %s decision: is_from_merchant=%s, latest_sender_was_ccd=%s, thread_has_account_recipient=%s, latest_message_is_from_us=%s, merchanthelp_has_responded=%s, should_reply=%s, has_been_replied=%s, latest_sender=%s",
+                        thread_id, is_from_merchant, latest_sender_was_ccd, thread_has_account_recipient, latest_message_is_from_us, merchanthelp_has_responded, should_reply, has_been_replied, latest_sender_normalized)
         
-        if should_reply and not has_been_replied:
+        if not has_been_replied:
             # If latest sender is not a merchant, we need to find the account_info from the thread
             account_info = latest_email.get('account_info')
             
@@ -3650,10 +3758,10 @@ def get_emails_needing_replies_with_accounts(accounts):
                 # Find the first Workato account that appears in To/CC of any message in this thread
                 for email_in_thread in emails_in_thread:
                     try:
-                        msg_data = service.users().messages().get(userId='me', id=email_in_thread['id']).execute()
-                        headers = msg_data['payload'].get('headers', [])
-                        to_header = next((h['value'] for h in headers if h['name'] == 'To'), '')
-                        cc_header = next((h['value'] for h in headers if h['name'] == 'Cc'), '')
+                        msg_data = _get(email_in_thread['id'])
+                        headers = get_header_map(msg_data['payload'].get('headers', []))
+                        to_header = headers.get('To', '')
+                        cc_header = headers.get('Cc', '')
                         
                         to_emails = parse_email_list(to_header)
                         cc_emails = parse_email_list(cc_header)
@@ -3678,38 +3786,31 @@ def get_emails_needing_replies_with_accounts(accounts):
             # Ensure email has all required fields for reply processing
             if not account_info:
                 logger.warning(f"⚠️ Thread {thread_id} needs reply but missing account_info, skipping")
-                continue
+                return None, None
             
             # Extract email address from latest message - try multiple sources
             # If sender is empty (common for SENT messages), try to get from To header
             reply_to_email = None
-            sender_field = latest_email.get('sender', '')
+            sender_field = sender
             
             # Try to extract from sender field first
             if sender_field:
-                if '<' in sender_field and '>' in sender_field:
-                    reply_to_email = sender_field.split('<')[1].split('>')[0].strip()
-                elif '@' in sender_field:
-                    reply_to_email = sender_field.strip()
+                reply_to_email = extract_email_from_header(sender_field, preserve_case=True)
             
             # If still no email, try to get from To header of the latest message
             if not reply_to_email or '@' not in reply_to_email:
                 try:
-                    latest_msg_data = service.users().messages().get(userId='me', id=latest_email['id']).execute()
-                    latest_headers = latest_msg_data['payload'].get('headers', [])
-                    to_header = next((h['value'] for h in latest_headers if h['name'] == 'To'), '')
+                    latest_msg_data = _get(latest_email['id'])
+                    to_header = get_header_map(latest_msg_data['payload'].get('headers', [])).get('To', '')
                     if to_header:
-                        if '<' in to_header and '>' in to_header:
-                            reply_to_email = to_header.split('<')[1].split('>')[0].strip()
-                        elif '@' in to_header:
-                            reply_to_email = to_header.strip()
+                        reply_to_email = extract_email_from_header(to_header, preserve_case=True)
                 except Exception as e:
                     logger.debug(f"Could not extract To header for {latest_email['id']}: {e}")
             
             # If still no email, skip this thread
             if not reply_to_email or '@' not in reply_to_email:
                 logger.warning(f"⚠️ Could not extract valid email address for thread {thread_id}, skipping. Sender field: '{sender_field}'")
-                continue
+                return None, None
             
             # Add account info to email for reply processing
             reply_email = {
@@ -3723,48 +3824,117 @@ def get_emails_needing_replies_with_accounts(accounts):
                 'account_id': account_info.get('account_id'),
                 'contact_id': account_info.get('contact_id')
             }
-            emails_needing_replies.append(reply_email)
-            if is_from_merchant:
-                logger.info(f"Conversation thread {thread_id} from {latest_email['sender']} needs a reply (last message from merchant, normalized: {latest_sender_normalized})")
-            else:
-                logger.info(f"Conversation thread {thread_id} from {latest_email['sender']} needs a reply (last message from CC'd participant, normalized: {latest_sender_normalized})")
+            outcome = None
+            if info_enabled:
+                outcome = _THREAD_OUTCOME_LOG_TEMPLATES[is_from_merchant] % (thread_id, sender, latest_sender_normalized)
+            return reply_email, outcome
         else:
-            if not should_reply:
-                logger.info(f"Conversation thread {thread_id} - latest message doesn't require reply (is_from_merchant={is_from_merchant}, latest_sender_was_ccd={latest_sender_was_ccd}, thread_has_account_recipient={thread_has_account_recipient})")
-            else:
-                logger.info(f"Conversation thread {thread_id} from {latest_email['sender']} already has a reply")
+            outcome = None
+            if info_enabled:
+                outcome = _THREAD_OUTCOME_LOG_TEMPLATES[3] % (thread_id, sender)
+            return None, outcome
+
+    # Thread decisions are I/O bound (Gmail calls) - fan them out across worker threads
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        decisions = list(executor.map(decide_thread, thread_emails.items()))
+    emails_needing_replies = [reply_email for reply_email, _ in decisions if reply_email]
+
+    # One log call for all thread outcomes instead of one per thread
+    if info_enabled:
+        outcome_lines = [outcome for _, outcome in decisions if outcome]
+        if outcome_lines:
+            logger.info("Conversation thread outcomes:\n%s", "\n".join(outcome_lines))
 
     logger.info(f"Found {len(emails_needing_replies)} conversation threads needing replies")
     return emails_needing_replies
 
-@app.route('/')
-def home():
-    """Home page with service info."""
-    db_status = "PostgreSQL (connected)" if DB_AVAILABLE else "Memory mode (no persistence)"
-    return jsonify({
+# Home-page endpoint listing - fixed for the process lifetime, so built once and frozen
+_HOME_ENDPOINTS = MappingProxyType({
+    'track_email_send': 'POST /api/track-send',
+    'tracking_pixel': 'GET /track/<tracking_id>',
+    'health_check': 'GET /api/health',
+    'tracking_stats': 'GET /api/stats',
+    'workato_reply_emails': 'POST /api/workato/reply-to-emails',
+    'workato_reply_status': 'POST /api/workato/reply-to-emails/status',
+    'workato_send_new_email': 'POST /api/workato/send-new-email',
+    'workato_check_email_sent': 'POST /api/workato/check-email-sent',
+    'workato_get_all_emails': 'GET/POST /api/workato/get-all-emails',
+    'workato_get_all_email_opens': 'GET/POST /api/workato/get-all-email-opens',
+    'workato_update_sfdc_task_id': 'POST /api/workato/update-sfdc-task-id',
+    'prompts_ui': 'GET /prompts',
+    'prompts_api': 'GET/POST /api/prompts',
+    'analytics_dashboard': 'GET /analytics'
+})
+
+def _build_home_json(db_status):
+    """Serialize the home-page service info for the given database status to compact JSON bytes."""
+    return json.dumps({
         'service': 'Email Tracking System with Workato Integration',
         'status': 'running',
         'version': '2.0.0',
         'database': db_status,
-        'endpoints': {
-            'track_email_send': 'POST /api/track-send',
-            'tracking_pixel': 'GET /track/<tracking_id>',
-            'health_check': 'GET /api/health',
-            'tracking_stats': 'GET /api/stats',
-            'workato_reply_emails': 'POST /api/workato/reply-to-emails',
-            'workato_reply_status': 'POST /api/workato/reply-to-emails/status',
-            'workato_send_new_email': 'POST /api/workato/send-new-email',
-            'workato_check_email_sent': 'POST /api/workato/check-email-sent',
-            'workato_get_all_emails': 'GET/POST /api/workato/get-all-emails',
-            'workato_get_all_email_opens': 'GET/POST /api/workato/get-all-email-opens',
-            'workato_update_sfdc_task_id': 'POST /api/workato/update-sfdc-task-id',
-            'prompts_ui': 'GET /prompts',
-            'prompts_api': 'GET/POST /api/prompts',
-            'analytics_dashboard': 'GET /analytics'
-        }
-    })
+        'endpoints': dict(_HOME_ENDPOINTS)
+    }, separators=(',', ':')).encode('utf-8')
+
+# Home-page JSON bytes serialized once per DB status (DB_AVAILABLE can flip at runtime)
+_HOME_JSON = {
+    True: _build_home_json("PostgreSQL (connected)"),
+    False: _build_home_json("Memory mode (no persistence)"),
+}
+
+@app.route('/')
+def home():
+    """Home page with service info."""
+    return Response(_HOME_JSON[bool(DB_AVAILABLE)], mimetype='application/json', headers={'Cache-Control': 'public, max-age=60'})
+
+# In-memory static assets are pre-split into write-sized chunks so the WSGI server can stream
+# the body without re-buffering it
+_ASSET_CHUNK_SIZE = 8192
+
+def _build_memory_asset(raw_bytes, content_type, cache_control):
+    """Precompute everything needed to serve a static asset from memory.
+
+    Builds the plain and gzip (level 9) representations once, each with its body chunks,
+    Content-Length and ETag (blake2b content hash - the gzip tag is suffixed since the
+    bytes on the wire differ).
+    """
+    etag = hashlib.blake2b(raw_bytes, digest_size=16).hexdigest()
+    gz_bytes = gzip.compress(raw_bytes, compresslevel=9)
+    variants = {}
+    for encoding, body, variant_etag in ((None, raw_bytes, etag), ('gzip', gz_bytes, f"{etag}-gzip")):
+        chunks = tuple(body[i:i + _ASSET_CHUNK_SIZE] for i in range(0, len(body), _ASSET_CHUNK_SIZE))
+        headers = {
+            'Content-Type': content_type,
+            'Content-Length': str(len(body)),
+            'Cache-Control': cache_control,
+            'Vary': 'Accept-Encoding'
+        }
+        if encoding:
+            headers['Content-Encoding'] = encoding
+        variants[encoding] = (chunks, headers, variant_etag)
+    return {'etag': etag, 'variants': variants}
+
+def _serve_memory_asset(asset):
+    """Stream a precomputed asset (gzip when the client accepts it) with conditional-request support."""
+    chunks, headers, etag = asset['variants']['gzip' if 'gzip' in request.accept_encodings else None]
+    response = Response(iter(chunks), status=200, direct_passthrough=True, headers=headers)
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+def _precompressed_page(view):
+    """Serve a view that always returns the same HTML from a memory asset built on its first request."""
+    asset = None
+
+    @functools.wraps(view)
+    def wrapper():
+        nonlocal asset
+        if asset is None:
+            asset = _build_memory_asset(view().encode('utf-8'), 'text/html; charset=utf-8', 'no-cache')
+        return _serve_memory_asset(asset)
+    return wrapper
 
 @app.route('/analytics')
+@_precompressed_page
 def analytics_dashboard():
     """Serve the cohort analytics dashboard."""
     return """
@@ -5005,6 +5175,7 @@ def analytics_dashboard():
     """
 
 @app.route('/snowflake')
+@_precompressed_page
 def snowflake_page():
     """Serve the Snowflake data viewer page."""
     return """
@@ -5206,6 +5377,7 @@ def snowflake_page():
     """
 
 @app.route('/voice-maestro')
+@_precompressed_page
 def voice_maestro_dashboard():
     """Serve the Voice Maestro dashboard showing call analytics."""
     return """
@@ -5907,1723 +6079,121 @@ def test_page():
 </html>
     """
 
+# Prompt types shown in the prompts UI sidebar (injected into the page as JSON)
+_PROMPT_TYPES = {
+    'new-email': {
+        'name': 'New Email Prompts',
+        'endpoint': '/api/workato/send-new-email',
+        'key': 'NEW_EMAIL_PROMPT_TEMPLATE'
+    },
+    'reply-email': {
+        'name': 'Reply Email Prompts',
+        'endpoint': '/api/workato/reply-to-emails',
+        'key': 'REPLY_EMAIL_PROMPT_TEMPLATE'
+    },
+    'voice-guidelines': {
+        'name': 'Voice Guidelines',
+        'endpoint': 'Global',
+        'key': 'AFFIRM_VOICE_GUIDELINES'
+    }
+}
+
+# Prompts UI script - a static file, served with a year-long immutable cache. The page references
+# it with its content hash in the query string, so a deploy that changes it changes the URL.
+# Minified once here when rjsmin is installed (kept readable when the app runs in debug mode).
+with open(os.path.join(app.static_folder, 'prompts.js'), 'rb') as f:
+    _prompts_js = f.read()
+if RJSMIN_AVAILABLE and not app.debug:
+    _prompts_js = rjsmin.jsmin(_prompts_js.decode('utf-8')).encode('utf-8')
+_PROMPTS_JS_ASSET = _build_memory_asset(
+    _prompts_js, 'application/javascript; charset=utf-8', 'public, max-age=31536000, immutable')
+
+# The prompts UI shell is a static Jinja template (templates/prompts.html). Render it once at
+# import - the compiled template is kept in Jinja's bytecode cache - and serve it from memory.
+# no-cache: browsers revalidate via ETag (304) so a new script version is picked up right away.
+with app.app_context():
+    _PROMPTS_HTML_ASSET = _build_memory_asset(
+        render_template(
+            'prompts.html',
+            prompt_types=_PROMPT_TYPES,
+            prompts_js_version=_PROMPTS_JS_ASSET['etag'][:12]
+        ).encode('utf-8'),
+        'text/html; charset=utf-8',
+        'no-cache'
+    )
+
 @app.route('/prompts')
 def prompts_ui():
     """Serve the prompts management UI."""
-    import os
-    from flask import send_from_directory
-    
-    # Try multiple possible paths
-    possible_paths = [
-        'templates/prompts.html',
-        os.path.join(os.path.dirname(__file__), 'templates', 'prompts.html'),
-        os.path.join(os.getcwd(), 'templates', 'prompts.html'),
-        'prompts.html'
-    ]
-    
-    for path in possible_paths:
-        if os.path.exists(path):
-            try:
-                with open(path, 'r', encoding='utf-8') as f:
-                    return f.read(), 200, {'Content-Type': 'text/html; charset=utf-8'}
-            except Exception as e:
-                logger.error(f"Error reading prompts.html from {path}: {e}")
-                continue
-    
-    # If file not found, return embedded HTML
-    return """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Mail Maestro - Prompt Management</title>
-    <link rel="stylesheet" href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap">
-    <style>
-        * { 
-            margin: 0; 
-            padding: 0; 
-            box-sizing: border-box; 
-        }
-        
-        :root {
-            --primary: #6366f1;
-            --primary-dark: #4f46e5;
-            --primary-light: #818cf8;
-            --success: #10b981;
-            --success-dark: #059669;
-            --warning: #f59e0b;
-            --danger: #ef4444;
-            --gray-50: #f9fafb;
-            --gray-100: #f3f4f6;
-            --gray-200: #e5e7eb;
-            --gray-300: #d1d5db;
-            --gray-600: #4b5563;
-            --gray-700: #374151;
-            --gray-800: #1f2937;
-            --gray-900: #111827;
-        }
-        
-        body {
-            font-family: 'Inter', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-            background: #f5f5f5;
-            margin: 0;
-            padding: 0;
-            min-height: 100vh;
-            line-height: 1.6;
-        }
-
-        .app-container {
-            display: flex;
-            height: 100vh;
-            overflow: hidden;
-        }
-
-        /* Left Icon Sidebar */
-        .sidebar {
-            width: 72px;
-            background: white;
-            display: flex;
-            flex-direction: column;
-            align-items: center;
-            padding: 20px 0;
-            box-shadow: 2px 0 4px rgba(0,0,0,0.06);
-            border-right: 1px solid #e5e7eb;
-        }
-
-        .sidebar-brand {
-            font-size: 24px;
-            margin-bottom: 40px;
-            color: #6366f1;
-        }
-
-        .sidebar-nav {
-            display: flex;
-            flex-direction: column;
-            gap: 24px;
-            width: 100%;
-            align-items: center;
-        }
-
-        .nav-item {
-            display: flex;
-            flex-direction: column;
-            align-items: center;
-            gap: 4px;
-            padding: 12px;
-            color: #6b7280;
-            text-decoration: none;
-            font-size: 11px;
-            font-weight: 500;
-            transition: all 0.2s;
-            cursor: pointer;
-            border-radius: 8px;
-        }
-
-        .nav-item:hover {
-            color: #1f2937;
-            background: #f3f4f6;
-        }
-
-        .nav-item.active {
-            color: #6366f1;
-            background: #eff6ff;
-        }
-
-        .nav-item-icon {
-            font-size: 24px;
-        }
-
-        /* Main Wrapper */
-        .main-wrapper {
-            display: flex;
-            flex-direction: column;
-            flex: 1;
-            overflow: hidden;
-        }
-
-        .content-header {
-            background: white;
-            padding: 24px 40px;
-            border-bottom: 1px solid #e5e7eb;
-        }
-
-        .content-header h1 {
-            font-size: 24px;
-            font-weight: 600;
-            color: #2c3e50;
-            margin: 0;
-        }
-
-        .main-layout {
-            display: flex;
-            flex: 1;
-            overflow: hidden;
-        }
-
-        /* Version Management Sidebar */
-        .version-sidebar {
-            width: 280px;
-            background: white;
-            border-right: 1px solid #e5e7eb;
-            overflow-y: auto;
-            padding: 24px;
-        }
-        
-        .version-sidebar-search {
-            width: 100%;
-            padding: 10px 12px;
-            border: 1px solid #e5e7eb;
-            border-radius: 8px;
-            font-size: 14px;
-            margin-bottom: 24px;
-        }
-        
-        .sidebar-section {
-            margin-bottom: 32px;
-        }
-        
-        .sidebar-section-title {
-            font-size: 12px;
-            font-weight: 600;
-            color: #6b7280;
-            text-transform: uppercase;
-            letter-spacing: 0.05em;
-            margin-bottom: 12px;
-            display: flex;
-            align-items: center;
-            justify-content: space-between;
-        }
-        
-        .prompt-type-item {
-            display: flex;
-            align-items: center;
-            padding: 10px 12px;
-            border-radius: 8px;
-            cursor: pointer;
-            margin-bottom: 4px;
-            transition: all 0.2s;
-            color: #374151;
-            font-size: 14px;
-        }
-        
-        .prompt-type-item:hover {
-            background: #f3f4f6;
-        }
-        
-        .prompt-type-item.active {
-            background: #eff6ff;
-            color: #2563eb;
-            font-weight: 500;
-        }
-        
-        .prompt-type-item .dot {
-            width: 8px;
-            height: 8px;
-            border-radius: 50%;
-            background: #10b981;
-            margin-right: 12px;
-        }
-        
-        .content-area {
-            flex: 1;
-            display: flex;
-            flex-direction: column;
-            overflow: hidden;
-            background: #f9fafb;
-        }
-        
-        .content-header {
-            background: white;
-            border-bottom: 1px solid #e5e7eb;
-            padding: 20px 24px;
-        }
-        
-        .tabs {
-            display: flex;
-            gap: 8px;
-            margin-bottom: 16px;
-        }
-        
-        .tab {
-            padding: 8px 16px;
-            border: none;
-            background: transparent;
-            border-radius: 6px;
-            cursor: pointer;
-            font-size: 14px;
-            font-weight: 500;
-            color: #6b7280;
-            transition: all 0.2s;
-        }
-        
-        .tab:hover {
-            background: #f3f4f6;
-        }
-        
-        .tab.active {
-            background: #eff6ff;
-            color: #2563eb;
-        }
-        
-        .tab-count {
-            margin-left: 6px;
-            color: #9ca3af;
-        }
-        
-        .table-container {
-            flex: 1;
-            overflow-y: auto;
-            background: white;
-            margin: 0 24px 24px 24px;
-            border-radius: 8px;
-            border: 1px solid #e5e7eb;
-        }
-        
-        .table {
-            width: 100%;
-            border-collapse: collapse;
-        }
-        
-        .table thead {
-            background: #f9fafb;
-            position: sticky;
-            top: 0;
-            z-index: 10;
-        }
-        
-        .table th {
-            padding: 12px 16px;
-            text-align: left;
-            font-size: 12px;
-            font-weight: 600;
-            color: #6b7280;
-            text-transform: uppercase;
-            letter-spacing: 0.05em;
-            border-bottom: 1px solid #e5e7eb;
-        }
-        
-        .table td {
-            padding: 16px;
-            border-bottom: 1px solid #f3f4f6;
-            font-size: 14px;
-            color: #374151;
-        }
-        
-        .table tbody tr:hover {
-            background: #f9fafb;
-        }
-        
-        .table tbody tr:last-child td {
-            border-bottom: none;
-        }
-        
-        .prompt-variant-name {
-            font-weight: 500;
-            color: #111827;
-            margin-bottom: 4px;
-        }
-        
-        .prompt-preview {
-            color: #6b7280;
-            font-size: 13px;
-            max-width: 500px;
-            overflow: hidden;
-            text-overflow: ellipsis;
-            white-space: nowrap;
-        }
-        
-        .status-badge {
-            display: inline-flex;
-            align-items: center;
-            padding: 4px 10px;
-            border-radius: 12px;
-            font-size: 12px;
-            font-weight: 500;
-        }
-        
-        .status-active {
-            background: #d1fae5;
-            color: #065f46;
-        }
-        
-        .status-draft {
-            background: #fef3c7;
-            color: #92400e;
-        }
-        
-        .status-archived {
-            background: #f3f4f6;
-            color: #6b7280;
-        }
-        
-        .edit-btn {
-            padding: 6px 12px;
-            background: #eff6ff;
-            color: #2563eb;
-            border: none;
-            border-radius: 6px;
-            font-size: 13px;
-            font-weight: 500;
-            cursor: pointer;
-            transition: all 0.2s;
-        }
-        
-        .edit-btn:hover {
-            background: #dbeafe;
-        }
-        
-        .modal {
-            display: none;
-            position: fixed;
-            top: 0;
-            left: 0;
-            right: 0;
-            bottom: 0;
-            background: rgba(0,0,0,0.5);
-            z-index: 1000;
-            align-items: center;
-            justify-content: center;
-        }
-        
-        .modal.active {
-            display: flex;
-        }
-        
-        .modal-content {
-            background: white;
-            border-radius: 12px;
-            width: 90%;
-            max-width: 800px;
-            max-height: 90vh;
-            display: flex;
-            flex-direction: column;
-        }
-        
-        .modal-header {
-            padding: 20px 24px;
-            border-bottom: 1px solid #e5e7eb;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }
-        
-        .modal-title {
-            font-size: 18px;
-            font-weight: 600;
-            color: #111827;
-        }
-        
-        .modal-close {
-            width: 32px;
-            height: 32px;
-            border: none;
-            background: transparent;
-            border-radius: 6px;
-            cursor: pointer;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            color: #6b7280;
-        }
-        
-        .modal-close:hover {
-            background: #f3f4f6;
-        }
-        
-        .modal-body {
-            padding: 24px;
-            overflow-y: auto;
-            flex: 1;
-        }
-        
-        .modal-textarea {
-            width: 100%;
-            min-height: 400px;
-            padding: 16px;
-            border: 1px solid #e5e7eb;
-            border-radius: 8px;
-            font-family: 'SF Mono', 'Monaco', 'Menlo', 'Courier New', monospace;
-            font-size: 13px;
-            line-height: 1.6;
-            resize: vertical;
-        }
-        
-        .modal-footer {
-            padding: 16px 24px;
-            border-top: 1px solid #e5e7eb;
-            display: flex;
-            justify-content: flex-end;
-            gap: 12px;
-        }
-        
-        .btn-primary {
-            padding: 10px 20px;
-            background: #2563eb;
-            color: white;
-            border: none;
-            border-radius: 6px;
-            font-size: 14px;
-            font-weight: 500;
-            cursor: pointer;
-        }
-        
-        .btn-secondary {
-            padding: 10px 20px;
-            background: #f3f4f6;
-            color: #374151;
-            border: none;
-            border-radius: 6px;
-            font-size: 14px;
-            font-weight: 500;
-            cursor: pointer;
-        }
-        
-        @keyframes slideUp {
-            from {
-                opacity: 0;
-                transform: translateY(20px);
-            }
-            to {
-                opacity: 1;
-                transform: translateY(0);
-            }
-        }
-        
-        .header {
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            padding: 50px 40px;
-            text-align: center;
-            position: relative;
-            overflow: hidden;
-        }
-        
-        .header::before {
-            content: '';
-            position: absolute;
-            top: -50%;
-            right: -50%;
-            width: 200%;
-            height: 200%;
-            background: radial-gradient(circle, rgba(255,255,255,0.1) 0%, transparent 70%);
-            animation: pulse 8s ease-in-out infinite;
-        }
-        
-        @keyframes pulse {
-            0%, 100% { transform: scale(1); opacity: 0.5; }
-            50% { transform: scale(1.1); opacity: 0.8; }
-        }
-        
-        .header h1 { 
-            font-size: 3em; 
-            margin-bottom: 12px; 
-            font-weight: 700;
-            letter-spacing: -0.02em;
-            position: relative;
-            z-index: 1;
-        }
-        
-        .header p { 
-            opacity: 0.95; 
-            font-size: 1.2em; 
-            font-weight: 400;
-            position: relative;
-            z-index: 1;
-        }
-        
-        .content { 
-            padding: 40px; 
-            background: var(--gray-50);
-        }
-        
-        .info-box {
-            background: linear-gradient(135deg, #dbeafe 0%, #bfdbfe 100%);
-            border: none;
-            border-radius: 16px;
-            padding: 20px 24px;
-            margin-bottom: 32px;
-            box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1);
-            border-left: 4px solid var(--primary);
-        }
-        
-        .info-box p { 
-            color: var(--gray-800); 
-            line-height: 1.7;
-            font-size: 0.95em;
-        }
-        
-        .prompt-card {
-            background: white;
-            border-radius: 20px;
-            padding: 32px;
-            margin-bottom: 32px;
-            border: 1px solid var(--gray-200);
-            box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1), 0 2px 4px -1px rgba(0, 0, 0, 0.06);
-            transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-            position: relative;
-            overflow: hidden;
-        }
-        
-        .prompt-card::before {
-            content: '';
-            position: absolute;
-            top: 0;
-            left: 0;
-            width: 4px;
-            height: 100%;
-            background: linear-gradient(180deg, var(--primary) 0%, var(--primary-light) 100%);
-            transition: width 0.3s ease;
-        }
-        
-        .prompt-card:hover {
-            transform: translateY(-4px);
-            box-shadow: 0 20px 25px -5px rgba(0, 0, 0, 0.1), 0 10px 10px -5px rgba(0, 0, 0, 0.04);
-        }
-        
-        .prompt-card:hover::before {
-            width: 6px;
-        }
-        
-        .prompt-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: flex-start;
-            margin-bottom: 20px;
-            gap: 20px;
-        }
-        
-        .prompt-title { 
-            font-size: 1.75em; 
-            font-weight: 700; 
-            color: var(--gray-900);
-            letter-spacing: -0.01em;
-            margin-bottom: 8px;
-        }
-        
-        .prompt-description { 
-            color: var(--gray-600); 
-            font-size: 0.95em;
-            line-height: 1.6;
-        }
-        
-        .endpoint-badge {
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            padding: 8px 16px;
-            border-radius: 12px;
-            font-size: 0.8em;
-            font-weight: 600;
-            white-space: nowrap;
-            box-shadow: 0 2px 4px rgba(99, 102, 241, 0.3);
-            letter-spacing: 0.01em;
-        }
-        
-        textarea {
-            width: 100%;
-            min-height: 320px;
-            padding: 20px;
-            border: 2px solid var(--gray-200);
-            border-radius: 12px;
-            font-family: 'SF Mono', 'Monaco', 'Menlo', 'Courier New', monospace;
-            font-size: 0.9em;
-            line-height: 1.7;
-            resize: vertical;
-            transition: all 0.3s ease;
-            background: var(--gray-50);
-            color: var(--gray-900);
-        }
-        
-        textarea:focus { 
-            outline: none; 
-            border-color: var(--primary);
-            background: white;
-            box-shadow: 0 0 0 4px rgba(99, 102, 241, 0.1);
-        }
-        
-        .button-group { 
-            display: flex; 
-            gap: 12px; 
-            margin-top: 20px;
-            flex-wrap: wrap;
-        }
-        
-        button {
-            padding: 14px 28px;
-            border: none;
-            border-radius: 12px;
-            font-size: 0.95em;
-            font-weight: 600;
-            cursor: pointer;
-            transition: all 0.2s cubic-bezier(0.4, 0, 0.2, 1);
-            position: relative;
-            overflow: hidden;
-            letter-spacing: 0.01em;
-            box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-        }
-        
-        button::before {
-            content: '';
-            position: absolute;
-            top: 50%;
-            left: 50%;
-            width: 0;
-            height: 0;
-            border-radius: 50%;
-            background: rgba(255, 255, 255, 0.3);
-            transform: translate(-50%, -50%);
-            transition: width 0.6s, height 0.6s;
-        }
-        
-        button:active::before {
-            width: 300px;
-            height: 300px;
-        }
-        
-        .btn-save { 
-            background: linear-gradient(135deg, var(--success) 0%, var(--success-dark) 100%);
-            color: white;
-        }
-        
-        .btn-save:hover { 
-            transform: translateY(-2px);
-            box-shadow: 0 8px 16px rgba(16, 185, 129, 0.3);
-        }
-        
-        .btn-save:active {
-            transform: translateY(0);
-        }
-        
-        .btn-reset { 
-            background: linear-gradient(135deg, var(--gray-600) 0%, var(--gray-700) 100%);
-            color: white;
-        }
-        
-        .btn-reset:hover { 
-            transform: translateY(-2px);
-            box-shadow: 0 8px 16px rgba(75, 85, 99, 0.3);
-        }
-        
-        .btn-reset:active {
-            transform: translateY(0);
-        }
-        
-        button:disabled {
-            opacity: 0.6;
-            cursor: not-allowed;
-            transform: none !important;
-        }
-        
-        .status-message {
-            padding: 16px 20px;
-            border-radius: 12px;
-            margin-top: 16px;
-            display: none;
-            font-weight: 500;
-            animation: slideIn 0.3s ease-out;
-            box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-        }
-        
-        @keyframes slideIn {
-            from {
-                opacity: 0;
-                transform: translateX(-10px);
-            }
-            to {
-                opacity: 1;
-                transform: translateX(0);
-            }
-        }
-        
-        .status-success { 
-            background: linear-gradient(135deg, #d1fae5 0%, #a7f3d0 100%);
-            color: #065f46; 
-            border: 1px solid #6ee7b7;
-        }
-        
-        .status-error { 
-            background: linear-gradient(135deg, #fee2e2 0%, #fecaca 100%);
-            color: #991b1b; 
-            border: 1px solid #fca5a5;
-        }
-        
-        @media (max-width: 768px) {
-            .header h1 { font-size: 2em; }
-            .header p { font-size: 1em; }
-            .content { padding: 24px; }
-            .prompt-card { padding: 24px; }
-            .prompt-header { flex-direction: column; }
-            .endpoint-badge { align-self: flex-start; }
-        }
-    </style>
-</head>
-<body>
-    <div class="app-container">
-        <!-- Left Sidebar -->
-        <div class="sidebar">
-            <div class="sidebar-brand">✉️</div>
-            <div class="sidebar-nav">
-                <a href="/prompts" class="nav-item active">
-                    <span class="nav-item-icon">📝</span>
-                    <span>Prompts</span>
-                </a>
-                <a href="/analytics" class="nav-item">
-                    <span class="nav-item-icon">📊</span>
-                    <span>Analytics</span>
-                </a>
-                <a href="/voice-maestro" class="nav-item">
-                    <span class="nav-item-icon">📞</span>
-                    <span>Voice Maestro</span>
-                </a>
-            </div>
-        </div>
-
-        <!-- Main Wrapper -->
-        <div class="main-wrapper">
-            <div class="content-header">
-                <h1>Prompt Management</h1>
-            </div>
-
-            <div class="main-layout">
-            <div class="version-sidebar">
-                <input type="text" class="version-sidebar-search" placeholder="Search...">
-
-                <div class="sidebar-section">
-                    <div class="sidebar-section-title">Prompt Types</div>
-                    <div class="prompt-type-item active" onclick="selectPromptType('new-email', event)">
-                        <span class="dot"></span>
-                        New Email Prompts
-                    </div>
-                    <div class="prompt-type-item" onclick="selectPromptType('reply-email', event)">
-                        <span class="dot"></span>
-                        Reply Email Prompts
-                    </div>
-                    <div class="prompt-type-item" onclick="selectPromptType('non-campaign-email', event)">
-                        <span class="dot"></span>
-                        Non-Campaign Email Prompts
-                    </div>
-                    <div class="prompt-type-item" onclick="selectPromptType('voice-guidelines', event)">
-                        <span class="dot"></span>
-                        Voice Guidelines
-                    </div>
-                </div>
-                
-                <div class="sidebar-section">
-                    <div class="sidebar-section-title">Testing</div>
-                    <div class="prompt-type-item" onclick="selectPromptType('test-merchant', event)">
-                        <span class="dot"></span>
-                        Test Merchant
-                    </div>
-                </div>
-            </div>
-            
-            <div class="content-area">
-                <div class="content-header">
-                    <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 16px;">
-                        <div class="tabs">
-                            <button class="tab active" onclick="selectTab('all', event)">
-                                All prompts <span class="tab-count" id="all-count">3</span>
-                            </button>
-                            <button class="tab" onclick="selectTab('active', event)">
-                                Active <span class="tab-count" id="active-count">2</span>
-                            </button>
-                            <button class="tab" onclick="selectTab('draft', event)">
-                                Draft <span class="tab-count" id="draft-count">1</span>
-                            </button>
-                        </div>
-                        <button class="btn-primary" onclick="createNewVersion()" style="margin-left: auto;">+ Create Version</button>
-                    </div>
-                </div>
-                
-                <div style="display: flex; gap: 24px; flex: 1; overflow: hidden;">
-                    <div class="table-container" style="flex: 1;">
-                        <table class="table">
-                            <thead>
-                                <tr>
-                                    <th style="width: 40px;"><input type="checkbox"></th>
-                                    <th style="width: 60px;">#</th>
-                                    <th>Version Name / Preview</th>
-                                    <th style="width: 120px;">Status</th>
-                                    <th style="width: 150px;">Endpoint</th>
-                                    <th style="width: 120px;">Open Rate</th>
-                                    <th style="width: 100px;">Actions</th>
-                                    <th style="width: 100px;">Test</th>
-                                    <th style="width: 100px;">Delete</th>
-                                </tr>
-                            </thead>
-                            <tbody id="prompts-table-body">
-                                <!-- Table rows will be populated by JavaScript -->
-                            </tbody>
-                        </table>
-                    </div>
-                    
-                    <!-- Test Results Panel -->
-                    <div id="test-results-panel" style="display: none; width: 400px; background: white; border-left: 1px solid #e5e7eb; padding: 24px; overflow-y: auto;">
-                        <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 20px;">
-                            <h3 style="margin: 0; font-size: 18px; font-weight: 600;">Test Results</h3>
-                            <button onclick="closeTestPanel()" style="background: transparent; border: none; font-size: 20px; cursor: pointer; color: #6b7280; padding: 4px 8px;">✕</button>
-                        </div>
-                        
-                        <!-- Reply Input Section (only for reply-email prompts) -->
-                        <div id="test-reply-input-section" style="display: none; margin-bottom: 20px;">
-                            <label style="display: block; margin-bottom: 8px; font-weight: 500; color: #374151; font-size: 14px;">Message to Reply To:</label>
-                            <textarea id="test-reply-input" rows="6" style="width: 100%; padding: 12px; border: 1px solid #e5e7eb; border-radius: 8px; font-size: 14px; font-family: inherit; resize: vertical;" placeholder="Enter the message you want the AI to reply to..."></textarea>
-                            <button onclick="generateTestReply()" class="btn-primary" style="width: 100%; margin-top: 12px;">Generate Reply</button>
-                        </div>
-                        
-                        <div id="test-results-content" style="font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif; font-size: 14px; line-height: 1.6; background: #f9fafb; padding: 16px; border-radius: 8px; border: 1px solid #e5e7eb; min-height: 200px; overflow-y: auto; max-height: 600px;">
-                            Click "Test" on any prompt to see results here.
-                        </div>
-                    </div>
-                </div>
-                
-                <!-- Test Merchant Content -->
-                <div class="content-area" id="test-merchant-content" style="display: none;">
-                    <div class="content-header">
-                        <h2 style="margin: 0 0 24px 0; font-size: 24px; font-weight: 600;">Test Merchant</h2>
-                        <p style="color: #6b7280; margin-bottom: 24px;">Enter merchant information to test prompt responses</p>
-                    </div>
-                    
-                    <div style="padding: 24px; max-width: 1200px;">
-                        <div style="background: white; border-radius: 12px; padding: 24px; margin-bottom: 24px; box-shadow: 0 1px 3px rgba(0,0,0,0.1);">
-                            <h3 style="margin: 0 0 20px 0; font-size: 18px; font-weight: 600;">Merchant Information</h3>
-                            <form id="test-merchant-form" style="display: grid; grid-template-columns: repeat(2, 1fr); gap: 20px;">
-                                <div>
-                                    <label style="display: block; margin-bottom: 8px; font-weight: 500; color: #374151;">Merchant Name *</label>
-                                    <input type="text" id="merchant_name" name="merchant_name" required 
-                                           style="width: 100%; padding: 10px; border: 1px solid #e5e7eb; border-radius: 8px; font-size: 14px;" 
-                                           placeholder="Acme Corporation">
-                                </div>
-                                <div>
-                                    <label style="display: block; margin-bottom: 8px; font-weight: 500; color: #374151;">Contact Email</label>
-                                    <input type="email" id="contact_email" name="contact_email" 
-                                           style="width: 100%; padding: 10px; border: 1px solid #e5e7eb; border-radius: 8px; font-size: 14px;" 
-                                           placeholder="contact@acme.com">
-                                </div>
-                                <div>
-                                    <label style="display: block; margin-bottom: 8px; font-weight: 500; color: #374151;">Contact Title</label>
-                                    <input type="text" id="contact_title" name="contact_title" 
-                                           style="width: 100%; padding: 10px; border: 1px solid #e5e7eb; border-radius: 8px; font-size: 14px;" 
-                                           placeholder="CEO">
-                                </div>
-                                <div>
-                                    <label style="display: block; margin-bottom: 8px; font-weight: 500; color: #374151;">Industry</label>
-                                    <input type="text" id="merchant_industry" name="merchant_industry" 
-                                           style="width: 100%; padding: 10px; border: 1px solid #e5e7eb; border-radius: 8px; font-size: 14px;" 
-                                           placeholder="E-commerce">
-                                </div>
-                                <div>
-                                    <label style="display: block; margin-bottom: 8px; font-weight: 500; color: #374151;">Website</label>
-                                    <input type="url" id="merchant_website" name="merchant_website" 
-                                           style="width: 100%; padding: 10px; border: 1px solid #e5e7eb; border-radius: 8px; font-size: 14px;" 
-                                           placeholder="https://acme.com">
-                                </div>
-                                <div>
-                                    <label style="display: block; margin-bottom: 8px; font-weight: 500; color: #374151;">Location</label>
-                                    <input type="text" id="account_location" name="account_location" 
-                                           style="width: 100%; padding: 10px; border: 1px solid #e5e7eb; border-radius: 8px; font-size: 14px;" 
-                                           placeholder="San Francisco, CA">
-                                </div>
-                                <div>
-                                    <label style="display: block; margin-bottom: 8px; font-weight: 500; color: #374151;">Annual Revenue ($)</label>
-                                    <input type="number" id="account_revenue" name="account_revenue" 
-                                           style="width: 100%; padding: 10px; border: 1px solid #e5e7eb; border-radius: 8px; font-size: 14px;" 
-                                           placeholder="1000000">
-                                </div>
-                                <div>
-                                    <label style="display: block; margin-bottom: 8px; font-weight: 500; color: #374151;">Employees</label>
-                                    <input type="number" id="account_employees" name="account_employees" 
-                                           style="width: 100%; padding: 10px; border: 1px solid #e5e7eb; border-radius: 8px; font-size: 14px;" 
-                                           placeholder="50">
-                                </div>
-                                <div>
-                                    <label style="display: block; margin-bottom: 8px; font-weight: 500; color: #374151;">GMV ($)</label>
-                                    <input type="number" id="account_gmv" name="account_gmv" 
-                                           style="width: 100%; padding: 10px; border: 1px solid #e5e7eb; border-radius: 8px; font-size: 14px;" 
-                                           placeholder="5000000">
-                                </div>
-                                <div>
-                                    <label style="display: block; margin-bottom: 8px; font-weight: 500; color: #374151;">Last Activity</label>
-                                    <input type="text" id="last_activity" name="last_activity" 
-                                           style="width: 100%; padding: 10px; border: 1px solid #e5e7eb; border-radius: 8px; font-size: 14px;" 
-                                           placeholder="Recent" value="Recent">
-                                </div>
-                                <div style="grid-column: 1 / -1;">
-                                    <label style="display: block; margin-bottom: 8px; font-weight: 500; color: #374151;">Account Description</label>
-                                    <textarea id="account_description" name="account_description" rows="3" 
-                                              style="width: 100%; padding: 10px; border: 1px solid #e5e7eb; border-radius: 8px; font-size: 14px; font-family: inherit;" 
-                                              placeholder="A leading e-commerce platform..."></textarea>
-                                </div>
-                                <div style="grid-column: 1 / -1; display: flex; gap: 12px; margin-top: 8px;">
-                                    <button type="button" onclick="saveTestMerchant()" class="btn-primary" style="flex: 0 0 auto;">Save Test Merchant</button>
-                                    <button type="button" onclick="loadTestMerchant()" class="btn-secondary" style="flex: 0 0 auto;">Load Saved</button>
-                                </div>
-                            </form>
-                        </div>
-                        
-                        <div style="background: white; border-radius: 12px; padding: 24px; box-shadow: 0 1px 3px rgba(0,0,0,0.1);">
-                            <h3 style="margin: 0 0 20px 0; font-size: 18px; font-weight: 600;">Generate Sample Response</h3>
-                            <div style="margin-bottom: 20px;">
-                                <label style="display: block; margin-bottom: 8px; font-weight: 500; color: #374151;">Prompt Type</label>
-                                <select id="sample-prompt-type" style="width: 100%; padding: 10px; border: 1px solid #e5e7eb; border-radius: 8px; font-size: 14px;">
-                                    <option value="new-email">New Email</option>
-                                    <option value="reply-email">Reply Email</option>
-                                </select>
-                            </div>
-                            <div id="conversation-context-section" style="margin-bottom: 20px; display: none;">
-                                <label style="display: block; margin-bottom: 8px; font-weight: 500; color: #374151;">Conversation Context (for reply emails)</label>
-                                <textarea id="conversation_context" rows="4" 
-                                          style="width: 100%; padding: 10px; border: 1px solid #e5e7eb; border-radius: 8px; font-size: 14px; font-family: inherit;" 
-                                          placeholder="Previous conversation history..."></textarea>
-                            </div>
-                            <div style="margin-bottom: 20px;">
-                                <label style="display: block; margin-bottom: 8px; font-weight: 500; color: #374151;">Use Custom Prompt (optional - leave empty to use default/current prompt)</label>
-                                <textarea id="custom-prompt-content" rows="6" 
-                                          style="width: 100%; padding: 10px; border: 1px solid #e5e7eb; border-radius: 8px; font-size: 14px; font-family: 'Courier New', monospace;" 
-                                          placeholder="Leave empty to use the current prompt version, or paste a custom prompt template here..."></textarea>
-                            </div>
-                            <button type="button" onclick="generateSample()" class="btn-primary" style="width: 100%;">Generate Sample Response</button>
-                            
-                            <div id="sample-results" style="margin-top: 24px; display: none;">
-                                <h4 style="margin: 0 0 12px 0; font-size: 16px; font-weight: 600;">Generated Response</h4>
-                                <div id="sample-output" style="background: #f9fafb; border: 1px solid #e5e7eb; border-radius: 8px; padding: 16px; white-space: pre-wrap; font-family: 'Courier New', monospace; font-size: 13px; line-height: 1.6;"></div>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div> <!-- end main-layout -->
-        </div> <!-- end main-wrapper -->
-    </div> <!-- end app-container -->
-
-    <!-- Edit Modal -->
-    <div class="modal" id="edit-modal">
-        <div class="modal-content">
-            <div class="modal-header">
-                <div class="modal-title" id="modal-title">Edit Prompt</div>
-                <button class="modal-close" onclick="closeModal()">✕</button>
-            </div>
-            <div class="modal-body">
-                <textarea class="modal-textarea" id="modal-textarea" placeholder="Enter prompt content..."></textarea>
-            </div>
-            <div class="modal-footer">
-                <button class="btn-secondary" onclick="closeModal()">Cancel</button>
-                <button class="btn-primary" onclick="savePromptFromModal()">Save</button>
-            </div>
-        </div>
-    </div>
-    
-    <script>
-        let currentPromptType = 'new-email';
-        let currentTab = 'all';
-        let promptsData = {
-            'new-email': [],
-            'reply-email': [],
-            'voice-guidelines': []
-        };
-        let currentEditingPrompt = null;
-        let variantStats = {};
-        
-        const promptTypes = {
-            'new-email': {
-                name: 'New Email Prompts',
-                endpoint: '/api/workato/send-new-email',
-                key: 'NEW_EMAIL_PROMPT_TEMPLATE'
-            },
-            'reply-email': {
-                name: 'Reply Email Prompts',
-                endpoint: '/api/workato/reply-to-emails',
-                key: 'REPLY_EMAIL_PROMPT_TEMPLATE'
-            },
-            'voice-guidelines': {
-                name: 'Voice Guidelines',
-                endpoint: 'Global',
-                key: 'AFFIRM_VOICE_GUIDELINES'
-            }
-        };
-        
-        async function loadStats() {
-            try {
-                const response = await fetch('/api/prompts/get-stats');
-                const data = await response.json();
-                console.log('Stats API response:', data);
-                if (data.status === 'success') {
-                    variantStats = data.stats || {};
-                    console.log('Stats loaded into variantStats:', variantStats);
-                } else {
-                    console.error('Stats API returned error:', data);
-                    variantStats = {};
-                }
-            } catch (error) {
-                console.error('Error loading stats:', error);
-                variantStats = {};
-            }
-        }
-        
-        window.addEventListener('DOMContentLoaded', async () => {
-            console.log('Loading prompts and stats...');
-            await Promise.all([loadAllPrompts(), loadStats()]);
-            console.log('Prompts loaded:', promptsData);
-            console.log('Stats loaded:', variantStats);
-            renderTable();
-        });
-        
-        function selectPromptType(type, event) {
-            currentPromptType = type;
-            document.querySelectorAll('.prompt-type-item').forEach(item => {
-                item.classList.remove('active');
-            });
-            if (event && event.currentTarget) {
-                event.currentTarget.classList.add('active');
-            } else {
-                // Fallback: find the clicked element by type
-                document.querySelectorAll('.prompt-type-item').forEach(item => {
-                    if (item.getAttribute('onclick') && item.getAttribute('onclick').includes(`'${type}'`)) {
-                        item.classList.add('active');
-                    }
-                });
-            }
-            
-            // Close test panel when switching prompts
-            const testPanel = document.getElementById('test-results-panel');
-            if (testPanel) {
-                testPanel.style.display = 'none';
-            }
-            
-            // Show/hide content areas
-            const tableContainer = document.querySelector('div[style*="display: flex"][style*="gap: 24px"]') || 
-                                   document.querySelector('.table-container')?.parentElement ||
-                                   document.querySelector('div[style*="flex: 1"]');
-            const testMerchantContent = document.getElementById('test-merchant-content');
-            
-            console.log('Switching to prompt type:', type);
-            console.log('Table container found:', !!tableContainer);
-            console.log('Test merchant content found:', !!testMerchantContent);
-            
-            if (type === 'test-merchant') {
-                if (tableContainer) {
-                    tableContainer.style.display = 'none';
-                    console.log('Hiding table container');
-                }
-                if (testMerchantContent) {
-                    testMerchantContent.style.display = 'block';
-                    console.log('Showing test merchant content');
-                    loadTestMerchant();
-                }
-            } else {
-                if (tableContainer) {
-                    tableContainer.style.display = 'flex';
-                    console.log('Showing table container');
-                }
-                if (testMerchantContent) {
-                    testMerchantContent.style.display = 'none';
-                    console.log('Hiding test merchant content');
-                }
-                
-                // Always reload prompts when switching types
-                console.log('Loading prompts for type:', type);
-                Promise.all([loadAllPrompts(), loadStats()]).then(() => {
-                    console.log('Reloaded prompts and stats for type:', type);
-                    console.log('Prompts for', type, ':', promptsData[type]);
-                    renderTable();
-                }).catch(error => {
-                    console.error('Error reloading prompts:', error);
-                    renderTable(); // Still try to render with existing data
-                });
-            }
-        }
-        
-        function selectTab(tab, event) {
-            currentTab = tab;
-            document.querySelectorAll('.tab').forEach(t => t.classList.remove('active'));
-            if (event && event.currentTarget) {
-                event.currentTarget.classList.add('active');
-            } else {
-                // Fallback: find the clicked element
-                document.querySelectorAll('.tab').forEach(t => {
-                    if (t.getAttribute('onclick') && t.getAttribute('onclick').includes(`'${tab}'`)) {
-                        t.classList.add('active');
-                    }
-                });
-            }
-            renderTable();
-        }
-        
-        async function loadAllPrompts() {
-            try {
-                console.log('Loading prompts from API...');
-                const [promptsResponse, versionsResponse] = await Promise.all([
-                    fetch('/api/prompts/get'),
-                    fetch('/api/prompts/get-versions')
-                ]);
-                
-                if (!promptsResponse.ok) {
-                    console.error('Failed to fetch prompts:', promptsResponse.status, promptsResponse.statusText);
-                }
-                
-                const promptsData_result = await promptsResponse.json();
-                console.log('Prompts API response:', promptsData_result);
-                
-                let versionsData = { status: 'success', versions: [] };
-                
-                try {
-                    if (versionsResponse.ok) {
-                        versionsData = await versionsResponse.json();
-                        console.log('Versions API response:', versionsData);
-                    }
-                } catch (e) {
-                    console.warn('Could not load versions:', e);
-                }
-                
-                if (promptsData_result.status === 'success') {
-                    // Start with default versions
-                    promptsData = {
-                        'new-email': [
-                            { id: 1, name: 'Default Version', preview: (promptsData_result.prompts.new_email_prompt || '').substring(0, 100) || 'Default new email prompt template...', status: 'active', endpoint: '/api/workato/send-new-email', key: 'NEW_EMAIL_PROMPT_TEMPLATE', content: promptsData_result.prompts.new_email_prompt || '', version_letter: null }
-                        ],
-                        'reply-email': [
-                            { id: 1, name: 'Default Version', preview: (promptsData_result.prompts.reply_email_prompt || '').substring(0, 100) || 'Default reply email prompt template...', status: 'active', endpoint: '/api/workato/reply-to-emails', key: 'REPLY_EMAIL_PROMPT_TEMPLATE', content: promptsData_result.prompts.reply_email_prompt || '', version_letter: null }
-                        ],
-                        'non-campaign-email': [
-                            { id: 1, name: 'Default Version', preview: (promptsData_result.prompts.non_campaign_email_prompt || '').substring(0, 100) || 'Default non-campaign email prompt template...', status: 'active', endpoint: '/api/workato/check-non-campaign-emails', key: 'NON_CAMPAIGN_EMAIL_PROMPT_TEMPLATE', content: promptsData_result.prompts.non_campaign_email_prompt || '', version_letter: null }
-                        ],
-                        'voice-guidelines': [
-                            { id: 1, name: 'Default Guidelines', preview: (promptsData_result.prompts.voice_guidelines || '').substring(0, 100) || 'Default voice guidelines...', status: 'active', endpoint: 'Global', key: 'AFFIRM_VOICE_GUIDELINES', content: promptsData_result.prompts.voice_guidelines || '', version_letter: null }
-                        ]
-                    };
-                    
-                    // Add versions from database
-                    if (versionsData.status === 'success' && versionsData.versions && Array.isArray(versionsData.versions)) {
-                        versionsData.versions.forEach((version, idx) => {
-                            const versionId = 1000 + version.id; // Use high IDs for versions
-                            const versionData = {
-                                id: versionId,
-                                name: version.version_name,
-                                preview: (version.prompt_content || '').substring(0, 100) || 'No preview...',
-                                status: version.status || 'draft',
-                                endpoint: version.endpoint_path,
-                                key: `${version.prompt_type.toUpperCase().replace('-', '_')}_PROMPT_TEMPLATE_${version.version_letter}`,
-                                content: version.prompt_content || '',
-                                version_letter: version.version_letter
-                            };
-                            
-                            if (version.prompt_type === 'new-email') {
-                                promptsData['new-email'].push(versionData);
-                            } else if (version.prompt_type === 'reply-email') {
-                                promptsData['reply-email'].push(versionData);
-                            } else if (version.prompt_type === 'non-campaign-email') {
-                                promptsData['non-campaign-email'].push(versionData);
-                            }
-                        });
-                    }
-                    
-                    console.log('Loaded prompts data:', promptsData);
-                } else {
-                    console.error('Failed to load prompts:', promptsData_result);
-                    // Initialize with empty data structure
-                    promptsData = {
-                        'new-email': [],
-                        'reply-email': [],
-                        'non-campaign-email': [],
-                        'voice-guidelines': []
-                    };
-                }
-            } catch (error) {
-                console.error('Error loading prompts:', error);
-                // Initialize with empty data structure on error
-                promptsData = {
-                    'new-email': [],
-                    'reply-email': [],
-                    'non-campaign-email': [],
-                    'voice-guidelines': []
-                };
-            }
-        }
-        
-        function renderTable() {
-            const tbody = document.getElementById('prompts-table-body');
-            if (!tbody) {
-                console.error('Table body not found!');
-                return;
-            }
-            
-            const prompts = promptsData[currentPromptType] || [];
-            console.log('Rendering table for type:', currentPromptType, 'with', prompts.length, 'prompts');
-            console.log('Prompts data:', prompts);
-            
-            const filtered = currentTab === 'all' ? prompts : prompts.filter(p => p.status === currentTab);
-            
-            if (filtered.length === 0) {
-                tbody.innerHTML = `
-                    <tr>
-                        <td colspan="9" style="text-align: center; padding: 40px; color: #6b7280;">
-                            No prompts found. ${prompts.length === 0 ? 'Click "+ Create Version" to create your first prompt version.' : 'Try selecting a different tab.'}
-                        </td>
-                    </tr>
-                `;
-            } else {
-                tbody.innerHTML = filtered.map((prompt, index) => {
-                    const endpoint = (prompt.endpoint || '/api/workato/send-new-email').trim();
-                    console.log(`Looking up stats for endpoint: "${endpoint}"`);
-                    console.log(`Available stats keys:`, Object.keys(variantStats));
-                    const stats = variantStats[endpoint] || { total_sent: 0, total_opened: 0, open_rate: 0 };
-                    const openRate = stats.open_rate || 0;
-                    const totalSent = stats.total_sent || 0;
-                    const totalOpened = stats.total_opened || 0;
-                    console.log(`Stats for "${endpoint}":`, stats);
-                    
-                    return `
-                    <tr>
-                        <td><input type="checkbox"></td>
-                        <td>${String(index + 1).padStart(2, '0')}</td>
-                        <td>
-                            <div class="prompt-variant-name">${prompt.name || 'Unnamed'}</div>
-                            <div class="prompt-preview">${prompt.preview || 'No preview available'}...</div>
-                        </td>
-                        <td>
-                            <span class="status-badge status-${prompt.status || 'draft'}">${(prompt.status || 'draft').charAt(0).toUpperCase() + (prompt.status || 'draft').slice(1)}</span>
-                        </td>
-                        <td>${prompt.endpoint || 'N/A'}</td>
-                        <td style="text-align: right;">
-                            <div style="font-weight: 600; color: #111827;">${openRate.toFixed(1)}%</div>
-                            <div style="font-size: 12px; color: #6b7280;">${totalOpened}/${totalSent} opened</div>
-                        </td>
-                        <td>
-                            <button class="edit-btn" onclick="openEditModal(${prompt.id})">Edit</button>
-                        </td>
-                        <td>
-                            <button class="edit-btn" onclick="testPrompt(${prompt.id})" style="background: #f0fdf4; color: #166534;">Test</button>
-                        </td>
-                        <td>
-                            ${prompt.version_letter ? `<button class="edit-btn" onclick="deletePrompt(${prompt.id})" style="background: #fef2f2; color: #991b1b;">Delete</button>` : '<span style="color: #9ca3af; font-size: 12px;">N/A</span>'}
-                        </td>
-                    </tr>
-                `;
-                }).join('');
-            }
-            
-            // Update counts
-            const allCount = prompts.length;
-            const activeCount = prompts.filter(p => p.status === 'active').length;
-            const draftCount = prompts.filter(p => p.status === 'draft').length;
-            
-            document.getElementById('all-count').textContent = allCount;
-            document.getElementById('active-count').textContent = activeCount;
-            document.getElementById('draft-count').textContent = draftCount;
-        }
-        
-        function openEditModal(promptId) {
-            const prompts = promptsData[currentPromptType] || [];
-            const prompt = prompts.find(p => p.id === promptId);
-            if (!prompt) return;
-            
-            currentEditingPrompt = prompt;
-            document.getElementById('modal-title').textContent = `Edit: ${prompt.name}`;
-            document.getElementById('modal-textarea').value = prompt.content || '';
-            document.getElementById('edit-modal').classList.add('active');
-        }
-        
-        function closeModal() {
-            document.getElementById('edit-modal').classList.remove('active');
-            currentEditingPrompt = null;
-        }
-        
-        async function savePromptFromModal() {
-            if (!currentEditingPrompt) return;
-            
-            const content = document.getElementById('modal-textarea').value.trim();
-            if (!content) {
-                alert('Prompt cannot be empty');
-                return;
-            }
-            
-            try {
-                // If it's a version (has version_letter), update via version endpoint
-                if (currentEditingPrompt.version_letter) {
-                    // Extract the real version ID from the database
-                    // The prompt.id is 1000 + version.id, so we need to extract the real version ID
-                    const versionId = currentEditingPrompt.id - 1000;
-                    
-                    const response = await fetch('/api/prompts/update-version', {
-                        method: 'POST',
-                        headers: { 'Content-Type': 'application/json' },
-                        body: JSON.stringify({ 
-                            version_id: versionId,
-                            prompt_content: content 
-                        })
-                    });
-                    
-                    const data = await response.json();
-                    if (data.status === 'success') {
-                        currentEditingPrompt.content = content;
-                        currentEditingPrompt.preview = content.substring(0, 100);
-                        await Promise.all([loadAllPrompts(), loadStats()]);
-                        renderTable();
-                        closeModal();
-                        alert('✅ Version prompt saved successfully!');
-                    } else {
-                        alert('❌ Error: ' + data.message);
-                    }
-                    return;
-                }
-                
-                const response = await fetch('/api/prompts/update', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ key: currentEditingPrompt.key, value: content })
-                });
-                
-                const data = await response.json();
-                if (data.status === 'success') {
-                    // Reload prompts from database to ensure sync
-                    await Promise.all([loadAllPrompts(), loadStats()]);
-                    renderTable();
-                    closeModal();
-                    alert('✅ Prompt saved successfully!');
-                } else {
-                    alert('❌ Error: ' + data.message);
-                }
-            } catch (error) {
-                alert('❌ Error saving prompt: ' + error.message);
-            }
-        }
-        
-        async function createNewVersion() {
-            if (currentPromptType === 'voice-guidelines') {
-                alert('Cannot create versions for voice guidelines');
-                return;
-            }
-            
-            const versionName = prompt('Enter version name:');
-            if (!versionName) return;
-            
-            const promptContent = prompt('Enter prompt content (or leave empty to edit later):');
-            
-            try {
-                const response = await fetch('/api/prompts/create-version', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({
-                        version_name: versionName,
-                        prompt_type: currentPromptType,
-                        prompt_content: promptContent || 'Enter your prompt here...'
-                    })
-                });
-                
-                const data = await response.json();
-                if (data.status === 'success') {
-                    alert(`✅ Version created! Endpoint: ${data.endpoint_path}`);
-                    await Promise.all([loadAllPrompts(), loadStats()]);
-                    renderTable();
-                } else {
-                    alert('❌ Error: ' + data.message);
-                }
-            } catch (error) {
-                alert('❌ Error creating version: ' + error.message);
-            }
-        }
-        
-        // Close modal on outside click
-        document.getElementById('edit-modal')?.addEventListener('click', (e) => {
-            if (e.target.id === 'edit-modal') {
-                closeModal();
-            }
-        });
-        
-        // Test Merchant Functions
-        async function saveTestMerchant() {
-            const form = document.getElementById('test-merchant-form');
-            const formData = {
-                merchant_name: document.getElementById('merchant_name').value,
-                contact_email: document.getElementById('contact_email').value,
-                contact_title: document.getElementById('contact_title').value,
-                merchant_industry: document.getElementById('merchant_industry').value,
-                merchant_website: document.getElementById('merchant_website').value,
-                account_description: document.getElementById('account_description').value,
-                account_revenue: parseFloat(document.getElementById('account_revenue').value) || 0,
-                account_employees: parseInt(document.getElementById('account_employees').value) || 0,
-                account_location: document.getElementById('account_location').value,
-                account_gmv: parseFloat(document.getElementById('account_gmv').value) || 0,
-                last_activity: document.getElementById('last_activity').value || 'Recent'
-            };
-            
-            if (!formData.merchant_name) {
-                alert('Please enter a merchant name');
-                return;
-            }
-            
-            try {
-                const response = await fetch('/api/test-merchants/save', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify(formData)
-                });
-                
-                const data = await response.json();
-                if (data.status === 'success') {
-                    alert('✅ Test merchant saved successfully!');
-                } else {
-                    alert('❌ Error: ' + data.message);
-                }
-            } catch (error) {
-                alert('❌ Error saving test merchant: ' + error.message);
-            }
-        }
-        
-        async function loadTestMerchant() {
-            try {
-                const response = await fetch('/api/test-merchants/get');
-                const data = await response.json();
-                
-                if (data.status === 'success' && data.merchant) {
-                    const m = data.merchant;
-                    document.getElementById('merchant_name').value = m.merchant_name || '';
-                    document.getElementById('contact_email').value = m.contact_email || '';
-                    document.getElementById('contact_title').value = m.contact_title || '';
-                    document.getElementById('merchant_industry').value = m.merchant_industry || '';
-                    document.getElementById('merchant_website').value = m.merchant_website || '';
-                    document.getElementById('account_description').value = m.account_description || '';
-                    document.getElementById('account_revenue').value = m.account_revenue || '';
-                    document.getElementById('account_employees').value = m.account_employees || '';
-                    document.getElementById('account_location').value = m.account_location || '';
-                    document.getElementById('account_gmv').value = m.account_gmv || '';
-                    document.getElementById('last_activity').value = m.last_activity || 'Recent';
-                }
-            } catch (error) {
-                console.error('Error loading test merchant:', error);
-            }
-        }
-        
-        async function generateSample() {
-            const promptType = document.getElementById('sample-prompt-type').value;
-            const conversationContext = document.getElementById('conversation_context').value;
-            const customPromptContent = document.getElementById('custom-prompt-content').value.trim();
-            
-            // Get current prompt content if editing and no custom prompt provided
-            let promptContent = null;
-            if (customPromptContent) {
-                promptContent = customPromptContent;
-            } else if (currentEditingPrompt && currentEditingPrompt.content) {
-                promptContent = currentEditingPrompt.content;
-            }
-            
-            const resultsDiv = document.getElementById('sample-results');
-            const outputDiv = document.getElementById('sample-output');
-            
-            resultsDiv.style.display = 'none';
-            outputDiv.textContent = 'Generating sample response...';
-            resultsDiv.style.display = 'block';
-            
-            try {
-                const response = await fetch('/api/test-merchants/generate-sample', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({
-                        prompt_type: promptType,
-                        prompt_content: promptContent,
-                        conversation_context: conversationContext
-                    })
-                });
-                
-                const data = await response.json();
-                if (data.status === 'success' && data.responses && data.responses.length > 0) {
-                    const response = data.responses[0];
-                    const output = `Subject: ${response.subject}\n\n${response.body}`;
-                    outputDiv.textContent = output;
-                } else {
-                    outputDiv.textContent = 'Error: ' + (data.message || 'Failed to generate sample');
-                }
-            } catch (error) {
-                outputDiv.textContent = 'Error: ' + error.message;
-            }
-        }
-        
-        // Show/hide conversation context based on prompt type
-        document.getElementById('sample-prompt-type')?.addEventListener('change', (e) => {
-            const contextSection = document.getElementById('conversation-context-section');
-            if (e.target.value === 'reply-email') {
-                contextSection.style.display = 'block';
-            } else {
-                contextSection.style.display = 'none';
-            }
-        });
-        
-        // Test Prompt Function
-        async function testPrompt(promptId) {
-            const prompts = promptsData[currentPromptType] || [];
-            const prompt = prompts.find(p => p.id === promptId);
-            if (!prompt) {
-                alert('Prompt not found');
-                return;
-            }
-            
-            // Skip test for voice guidelines
-            if (currentPromptType === 'voice-guidelines') {
-                alert('Cannot test voice guidelines. Please use a new-email, reply-email, or non-campaign-email prompt.');
-                return;
-            }
-            
-            // Show test panel
-            const testPanel = document.getElementById('test-results-panel');
-            const testContent = document.getElementById('test-results-content');
-            const replyInputSection = document.getElementById('test-reply-input-section');
-            const replyInput = document.getElementById('test-reply-input');
-            
-            testPanel.style.display = 'block';
-            
-            // Determine prompt type
-            const promptType = currentPromptType === 'new-email' ? 'new-email' : (currentPromptType === 'non-campaign-email' ? 'non-campaign-email' : 'reply-email');
-            
-            // For reply-email and non-campaign-email, show input box and wait for user input
-            if (promptType === 'reply-email' || promptType === 'non-campaign-email') {
-                replyInputSection.style.display = 'block';
-                testContent.innerHTML = 'Enter a message above and click "Generate Reply" to test the prompt.';
-                replyInput.value = '';
-                replyInput.focus();
-                // Store prompt info for later use
-                testContent.dataset.promptId = promptId;
-                testContent.dataset.promptContent = prompt.content || '';
-                testContent.dataset.promptType = promptType;
-            } else {
-                // For new-email, generate immediately
-                replyInputSection.style.display = 'none';
-                testContent.innerHTML = 'Generating test response...';
-                
-                try {
-                    const promptContent = prompt.content || '';
-                    
-                    const response = await fetch('/api/test-merchants/generate-sample', {
-                        method: 'POST',
-                        headers: { 'Content-Type': 'application/json' },
-                        body: JSON.stringify({
-                            prompt_type: promptType,
-                            prompt_content: promptContent,
-                            conversation_context: ''
-                        })
-                    });
-                    
-                    const data = await response.json();
-                    if (data.status === 'success' && data.responses && data.responses.length > 0) {
-                        const result = data.responses[0];
-                        // Display with HTML rendering for proper formatting
-                        const output = `<div style="margin-bottom: 16px;"><strong>Subject:</strong> ${result.subject}</div><div style="border-top: 1px solid #e5e7eb; padding-top: 16px;">${result.body}</div>`;
-                        testContent.innerHTML = output;
-                    } else {
-                        testContent.innerHTML = 'Error: ' + (data.message || 'Failed to generate sample. Make sure you have saved a test merchant first.');
-                    }
-                } catch (error) {
-                    testContent.innerHTML = 'Error: ' + error.message;
-                }
-            }
-        }
-        
-        // Generate Reply Function (for reply-email prompts)
-        async function generateTestReply() {
-            const replyInput = document.getElementById('test-reply-input');
-            const testContent = document.getElementById('test-results-content');
-            const messageToReplyTo = replyInput.value.trim();
-            
-            if (!messageToReplyTo) {
-                alert('Please enter a message to reply to');
-                return;
-            }
-            
-            // Get stored prompt info
-            const promptId = testContent.dataset.promptId;
-            const promptContent = testContent.dataset.promptContent || '';
-            const promptType = testContent.dataset.promptType || 'reply-email';
-            
-            if (!promptId) {
-                alert('Prompt information not found. Please click "Test" again.');
-                return;
-            }
-            
-            testContent.innerHTML = 'Generating reply...';
-            
-            try {
-                const response = await fetch('/api/test-merchants/generate-sample', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({
-                        prompt_type: promptType,
-                        prompt_content: promptContent,
-                        conversation_context: messageToReplyTo
-                    })
-                });
-                
-                const data = await response.json();
-                if (data.status === 'success' && data.responses && data.responses.length > 0) {
-                    const result = data.responses[0];
-                    // Display with HTML rendering for proper formatting
-                    const output = `<div style="margin-bottom: 16px;"><strong>Subject:</strong> ${result.subject}</div><div style="border-top: 1px solid #e5e7eb; padding-top: 16px;">${result.body}</div>`;
-                    testContent.innerHTML = output;
-                } else {
-                    testContent.innerHTML = 'Error: ' + (data.message || 'Failed to generate reply. Make sure you have saved a test merchant first.');
-                }
-            } catch (error) {
-                testContent.innerHTML = 'Error: ' + error.message;
-            }
-        }
-        
-        function closeTestPanel() {
-            document.getElementById('test-results-panel').style.display = 'none';
-        }
-        
-        // Delete Prompt Function
-        async function deletePrompt(promptId) {
-            const prompts = promptsData[currentPromptType] || [];
-            const prompt = prompts.find(p => p.id === promptId);
-            if (!prompt) {
-                alert('Prompt not found');
-                return;
-            }
-            
-            // Check if it's a default prompt (no version_letter)
-            if (!prompt.version_letter) {
-                alert('Cannot delete default prompts. You can only delete version prompts (A, B, C, etc.).');
-                return;
-            }
-            
-            // Confirm deletion
-            const confirmMessage = `Are you sure you want to delete "${prompt.name}" (Version ${prompt.version_letter})?\n\nThis action cannot be undone.`;
-            if (!confirm(confirmMessage)) {
-                return;
-            }
-            
-            try {
-                // Get the actual version ID from the database
-                // The prompt.id is 1000 + version.id, so we need to extract the real version ID
-                const versionId = prompt.id - 1000;
-                
-                const response = await fetch('/api/prompts/delete-version', {
-                    method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ version_id: versionId })
-                });
-                
-                const data = await response.json();
-                if (data.status === 'success') {
-                    alert('✅ Prompt version deleted successfully!');
-                    await Promise.all([loadAllPrompts(), loadStats()]);
-                    renderTable();
-                } else {
-                    alert('❌ Error: ' + data.message);
-                }
-            } catch (error) {
-                alert('❌ Error deleting prompt: ' + error.message);
-            }
-        }
-    </script>
-</body>
-</html>
-""", 200, {'Content-Type': 'text/html; charset=utf-8'}
-
-@app.route('/api/prompts/get', methods=['GET'])
-def get_prompts():
-    """Get all current prompts (from database first, then environment variables, then defaults)."""
-    try:
-        # Default prompt templates (extracted from code)
-        new_email_prompt_default = """Generate a **professional, Affirm-branded business email** to re-engage {merchant_name}, a merchant in the {merchant_industry_str} industry, who has not yet completed the integration with Affirm and has **not yet launched**. The goal is to encourage them to complete the integration — without offering a meeting or call.
+    return _serve_memory_asset(_PROMPTS_HTML_ASSET)
+
+@app.route('/prompts/prompts.js')
+def prompts_ui_script():
+    """Serve the prompts management UI script."""
+    return _serve_memory_asset(_PROMPTS_JS_ASSET)
+
+def dumps_json_bytes(payload):
+    """Serialize a payload of plain JSON types to bytes - orjson when installed, compact stdlib json otherwise."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+def json_response(payload, status=200):
+    """Build a JSON Response from a payload of plain JSON types (see dumps_json_bytes)."""
+    return Response(dumps_json_bytes(payload), status=status, mimetype='application/json')
+
+# Prompt reads (/api/prompts/get, /get-versions) are cached in-process for a couple of seconds
+# (/get-stats has its own longer TTL below). Writes bump the generation so this worker serves fresh data right away; other workers
+# catch up within the TTL.
+_PROMPTS_CACHE_TIMEOUT = 2
+_prompts_cache_generation = 0
+
+def _prompts_cache_key(name):
+    """Cache key builder for a prompt read endpoint (generation + endpoint + query string)."""
+    return lambda: f"prompts:{_prompts_cache_generation}:{name}:{request.query_string.decode()}"
+
+# Version stats only change when emails are tracked or opened, so they are kept longer; the
+# tracking endpoints bump their own generation so this worker's next read recomputes them.
+_VERSION_STATS_CACHE_TIMEOUT = 10
+_version_stats_cache_generation = 0
+
+def _version_stats_cache_key():
+    """Cache key for /api/prompts/get-stats (prompt and stats generations + query string)."""
+    return f"prompts:{_prompts_cache_generation}:{_version_stats_cache_generation}:get-stats:{request.query_string.decode()}"
+
+def _is_cacheable_prompts_response(rv):
+    """Only cache successful responses - errors are returned as (response, status) tuples."""
+    return not isinstance(rv, tuple)
+
+def _conditional_json(view):
+    """Answer a JSON read view with a content-hash ETag, and a 304 when the client already has it.
+
+    Sits outside cache.cached so the 304 itself is never cached; callers that need the plain
+    body (the bootstrap endpoint) call view.__wrapped__.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        rv = view(*args, **kwargs)
+        if isinstance(rv, tuple):
+            return rv
+        rv.set_etag(hashlib.blake2b(rv.get_data(), digest_size=16).hexdigest())
+        rv.headers['Cache-Control'] = 'private, no-cache'
+        return rv.make_conditional(request)
+    return wrapper
+
+def _invalidate_prompts_cache():
+    """Drop cached prompt reads after a prompt / version write."""
+    global _prompts_cache_generation
+    _prompts_cache_generation += 1
+
+def _invalidate_version_stats_cache():
+    """Drop cached version stats after an email_tracking send / open write."""
+    global _version_stats_cache_generation
+    _version_stats_cache_generation += 1
+
+# Default prompt templates served by /api/prompts/get when neither the database nor the
+# environment has a saved prompt.
+_NEW_EMAIL_PROMPT_DEFAULT = """Generate a **professional, Affirm-branded business email** to re-engage {merchant_name}, a merchant in the {merchant_industry_str} industry, who has not yet completed the integration with Affirm and has **not yet launched**. The goal is to encourage them to complete the integration — without offering a meeting or call.
 
 **Context:**
 - Contact Name: {merchant_name}
@@ -7665,7 +6235,7 @@ def get_prompts():
 
 Keep the email under 130 words. Make it feel natural and human, not like marketing automation."""
 
-        reply_email_prompt_default = """**TASK:** Generate a professional Affirm-branded email response to {recipient_name} from {sender_name}.
+_REPLY_EMAIL_PROMPT_DEFAULT = """**TASK:** Generate a professional Affirm-branded email response to {recipient_name} from {sender_name}.
 
 **CONVERSATION CONTEXT:**
 {conversation_context}
@@ -7690,8 +6260,8 @@ Keep the email under 130 words. Make it feel natural and human, not like marketi
 
 For all support, refer to merchanthelp@affirm.com Only."""
 
-        # Default prompt for non-campaign emails
-        non_campaign_email_prompt_default = """{AFFIRM_VOICE_GUIDELINES}
+# Default prompt for non-campaign emails
+_NON_CAMPAIGN_EMAIL_PROMPT_DEFAULT = """{AFFIRM_VOICE_GUIDELINES}
 
 **TASK:** Generate a professional, Affirm-branded email response to {sender_name} who reached out but is not part of an active campaign. Politely direct them to merchanthelp@affirm.com for merchant support and inquiries.
 
@@ -7714,56 +6284,87 @@ For all support, refer to merchanthelp@affirm.com Only."""
 
 For all merchant support, refer to merchanthelp@affirm.com only."""
 
+# Prompt key -> (prompt_type, endpoint) that /api/prompts/update saves a default prompt under
+_PROMPT_KEY_TARGETS = MappingProxyType({
+    'NEW_EMAIL_PROMPT_TEMPLATE': ('new-email', '/api/workato/send-new-email'),
+    'REPLY_EMAIL_PROMPT_TEMPLATE': ('reply-email', '/api/workato/reply-to-emails'),
+    'NON_CAMPAIGN_EMAIL_PROMPT_TEMPLATE': ('non-campaign-email', '/api/workato/check-non-campaign-emails')
+})
+
+# Values /api/prompts/reset restores for each prompt key
+_PROMPT_RESET_DEFAULTS = MappingProxyType({
+    'AFFIRM_VOICE_GUIDELINES': AFFIRM_VOICE_GUIDELINES,
+    'NEW_EMAIL_PROMPT_TEMPLATE': '',  # Will be extracted from code
+    'REPLY_EMAIL_PROMPT_TEMPLATE': ''  # Will be extracted from code
+})
+
+# Saved DEFAULT prompts only change through /api/prompts/update, so the prompt_versions read is
+# kept for 30 seconds; update_prompt drops it so this worker sees a save immediately.
+_SAVED_DEFAULT_PROMPTS_CACHE_KEY = 'prompts:saved-defaults'
+_SAVED_DEFAULT_PROMPTS_CACHE_TIMEOUT = 30
+
+def _load_saved_default_prompts():
+    """Return {prompt_type: prompt_content} for the DEFAULT rows in prompt_versions ({} if unavailable)."""
+    if not DB_AVAILABLE:
+        return {}
+    saved = cache.get(_SAVED_DEFAULT_PROMPTS_CACHE_KEY)
+    if saved is not None:
+        return saved
+    try:
+        conn = get_db_connection()
+        if not conn:
+            return {}
+        cursor = conn.cursor()
+        
+        # Get saved default prompts from prompt_versions table
+        cursor.execute('''
+            SELECT prompt_type, prompt_content
+            FROM prompt_versions
+            WHERE version_letter = 'DEFAULT'
+        ''')
+        saved = dict(cursor.fetchall())
+        conn.close()
+    except Exception as e:
+        logger.warning(f"Could not load prompts from database: {e}")
+        return {}
+    
+    logger.info("📝 Loaded prompts from database: new_email=%s, reply_email=%s, non_campaign_email=%s",
+                bool(saved.get('new-email')), bool(saved.get('reply-email')), bool(saved.get('non-campaign-email')))
+    cache.set(_SAVED_DEFAULT_PROMPTS_CACHE_KEY, saved, timeout=_SAVED_DEFAULT_PROMPTS_CACHE_TIMEOUT)
+    return saved
+
+@app.route('/api/prompts/get', methods=['GET'])
+@_conditional_json
+@cache.cached(timeout=_PROMPTS_CACHE_TIMEOUT, key_prefix=_prompts_cache_key('get'), response_filter=_is_cacheable_prompts_response)
+def get_prompts():
+    """Get all current prompts (from database first, then environment variables, then defaults)."""
+    try:
         # Try to get from database first (from prompt_versions table with version_letter = 'DEFAULT')
-        new_email_prompt = None
-        reply_email_prompt = None
-        non_campaign_email_prompt = None
         voice_guidelines = None
-        
-        if DB_AVAILABLE:
-            try:
-                conn = get_db_connection()
-                if conn:
-                    cursor = conn.cursor()
-                    
-                    # Get saved default prompts from prompt_versions table
-                    cursor.execute('''
-                        SELECT prompt_type, prompt_content
-                        FROM prompt_versions
-                        WHERE version_letter = 'DEFAULT'
-                    ''')
-                    
-                    for row in cursor.fetchall():
-                        prompt_type, content = row
-                        if prompt_type == 'new-email':
-                            new_email_prompt = content
-                        elif prompt_type == 'reply-email':
-                            reply_email_prompt = content
-                        elif prompt_type == 'non-campaign-email':
-                            non_campaign_email_prompt = content
-                    
-                    conn.close()
-                    logger.info(f"📝 Loaded prompts from database: new_email={bool(new_email_prompt)}, reply_email={bool(reply_email_prompt)}, non_campaign_email={bool(non_campaign_email_prompt)}")
-            except Exception as e:
-                logger.warning(f"Could not load prompts from database: {e}")
+        saved_prompts = _load_saved_default_prompts()
+        new_email_prompt = saved_prompts.get('new-email')
+        reply_email_prompt = saved_prompts.get('reply-email')
+        non_campaign_email_prompt = saved_prompts.get('non-campaign-email')
         
         # Fall back to environment variables if not in database
         if not new_email_prompt:
-            new_email_prompt = os.getenv('NEW_EMAIL_PROMPT_TEMPLATE', new_email_prompt_default)
+            new_email_prompt = os.getenv('NEW_EMAIL_PROMPT_TEMPLATE', _NEW_EMAIL_PROMPT_DEFAULT)
         if not reply_email_prompt:
-            reply_email_prompt = os.getenv('REPLY_EMAIL_PROMPT_TEMPLATE', reply_email_prompt_default)
+            reply_email_prompt = os.getenv('REPLY_EMAIL_PROMPT_TEMPLATE', _REPLY_EMAIL_PROMPT_DEFAULT)
         if not non_campaign_email_prompt:
-            non_campaign_email_prompt = os.getenv('NON_CAMPAIGN_EMAIL_PROMPT_TEMPLATE', non_campaign_email_prompt_default)
+            non_campaign_email_prompt = os.getenv('NON_CAMPAIGN_EMAIL_PROMPT_TEMPLATE', _NON_CAMPAIGN_EMAIL_PROMPT_DEFAULT)
         if not voice_guidelines:
             voice_guidelines = os.getenv('AFFIRM_VOICE_GUIDELINES', AFFIRM_VOICE_GUIDELINES)
         
-        # Update environment variables to keep them in sync
-        os.environ['NEW_EMAIL_PROMPT_TEMPLATE'] = new_email_prompt
-        os.environ['REPLY_EMAIL_PROMPT_TEMPLATE'] = reply_email_prompt
-        os.environ['NON_CAMPAIGN_EMAIL_PROMPT_TEMPLATE'] = non_campaign_email_prompt
-        os.environ['AFFIRM_VOICE_GUIDELINES'] = voice_guidelines
+        # Update environment variables to keep them in sync (only the ones that changed)
+        for env_key, value in (('NEW_EMAIL_PROMPT_TEMPLATE', new_email_prompt),
+                               ('REPLY_EMAIL_PROMPT_TEMPLATE', reply_email_prompt),
+                               ('NON_CAMPAIGN_EMAIL_PROMPT_TEMPLATE', non_campaign_email_prompt),
+                               ('AFFIRM_VOICE_GUIDELINES', voice_guidelines)):
+            if os.environ.get(env_key) != value:
+                os.environ[env_key] = value
         
-        return jsonify({
+        return json_response({
             'status': 'success',
             'prompts': {
                 'voice_guidelines': voice_guidelines,
@@ -7778,9 +6379,7 @@ For all merchant support, refer to merchanthelp@affirm.com only."""
             }
         })
     except Exception as e:
-        logger.error(f"Error getting prompts: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception("Error getting prompts")
         return jsonify({
             'status': 'error',
             'message': str(e)
@@ -7806,24 +6405,19 @@ def update_prompt():
                 'message': 'Missing key or value'
             }), 400
         
-        logger.info(f"📝 Prompt update requested: {prompt_key}")
-        logger.info(f"📝 New prompt value (first 200 chars): {prompt_value[:200]}...")
-        logger.info(f"📝 Prompt length: {len(prompt_value)} characters")
-        
-        # Map prompt_key to prompt_type and endpoint
-        prompt_type_map = {
-            'NEW_EMAIL_PROMPT_TEMPLATE': ('new-email', '/api/workato/send-new-email'),
-            'REPLY_EMAIL_PROMPT_TEMPLATE': ('reply-email', '/api/workato/reply-to-emails'),
-            'NON_CAMPAIGN_EMAIL_PROMPT_TEMPLATE': ('non-campaign-email', '/api/workato/check-non-campaign-emails')
-        }
+        logger.info("📝 Prompt update requested: %s", prompt_key)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("📝 New prompt value (first 200 chars): %s...", prompt_value[:200])
+            logger.info("📝 Prompt length: %d characters", len(prompt_value))
         
-        if prompt_key not in prompt_type_map:
+        prompt_target = _PROMPT_KEY_TARGETS.get(prompt_key)
+        if prompt_target is None:
             return jsonify({
                 'status': 'error',
                 'message': f'Invalid prompt key: {prompt_key}. Only NEW_EMAIL_PROMPT_TEMPLATE and REPLY_EMAIL_PROMPT_TEMPLATE are supported.'
             }), 400
         
-        prompt_type, endpoint_path = prompt_type_map[prompt_key]
+        prompt_type, endpoint_path = prompt_target
         
         # Save to database using prompt_versions table with version_letter = 'DEFAULT'
         conn = get_db_connection()
@@ -7835,48 +6429,35 @@ def update_prompt():
         
         cursor = conn.cursor()
         
-        # Check if default prompt already exists
+        # Insert the default prompt, or update it in place if one is already saved
+        # (UNIQUE(prompt_type, version_letter) makes this a single round-trip)
         cursor.execute('''
-            SELECT id FROM prompt_versions 
-            WHERE prompt_type = %s AND version_letter = 'DEFAULT'
-        ''', (prompt_type,))
-        existing = cursor.fetchone()
-        
-        if existing:
-            # Update existing default prompt
-            cursor.execute('''
-                UPDATE prompt_versions
-                SET prompt_content = %s,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE prompt_type = %s AND version_letter = 'DEFAULT'
-            ''', (prompt_value, prompt_type))
-            logger.info(f"✅ Updated existing default prompt {prompt_key} in database")
-        else:
-            # Insert new default prompt
-            cursor.execute('''
-                INSERT INTO prompt_versions 
-                (version_name, prompt_type, prompt_content, version_letter, endpoint_path, status)
-                VALUES (%s, %s, %s, %s, %s, %s)
-            ''', ('Default Version', prompt_type, prompt_value, 'DEFAULT', endpoint_path, 'active'))
-            logger.info(f"✅ Created new default prompt {prompt_key} in database")
+            INSERT INTO prompt_versions 
+            (version_name, prompt_type, prompt_content, version_letter, endpoint_path, status)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON CONFLICT (prompt_type, version_letter) DO UPDATE
+            SET prompt_content = EXCLUDED.prompt_content,
+                updated_at = CURRENT_TIMESTAMP
+        ''', ('Default Version', prompt_type, prompt_value, 'DEFAULT', endpoint_path, 'active'))
+        logger.info(f"✅ Saved default prompt {prompt_key} in database")
         
         conn.commit()
         conn.close()
+        cache.delete(_SAVED_DEFAULT_PROMPTS_CACHE_KEY)
+        _invalidate_prompts_cache()
         
         # Also update the environment variable for immediate use
         os.environ[prompt_key] = prompt_value
         
         logger.info(f"✅ Prompt {prompt_key} saved to database and updated in memory. Changes take effect immediately.")
         
-        return jsonify({
+        return json_response({
             'status': 'success',
             'message': f'Prompt {prompt_key} saved successfully. Changes take effect immediately for new emails.',
             'key': prompt_key
         })
     except Exception as e:
-        logger.error(f"Error updating prompt: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception("Error updating prompt")
         return jsonify({
             'status': 'error',
             'message': str(e)
@@ -7895,20 +6476,14 @@ def reset_prompt():
                 'message': 'Missing key'
             }), 400
         
-        # Default values
-        defaults = {
-            'AFFIRM_VOICE_GUIDELINES': AFFIRM_VOICE_GUIDELINES,
-            'NEW_EMAIL_PROMPT_TEMPLATE': '',  # Will be extracted from code
-            'REPLY_EMAIL_PROMPT_TEMPLATE': ''  # Will be extracted from code
-        }
-        
-        default_value = defaults.get(prompt_key, '')
+        default_value = _PROMPT_RESET_DEFAULTS.get(prompt_key, '')
         
         # Reset to default
-        if prompt_key in defaults:
+        if prompt_key in _PROMPT_RESET_DEFAULTS:
             os.environ[prompt_key] = default_value
+        _invalidate_prompts_cache()
         
-        return jsonify({
+        return json_response({
             'status': 'success',
             'message': f'Prompt {prompt_key} reset to default',
             'default_value': default_value
@@ -7921,6 +6496,7 @@ def reset_prompt():
         }), 500
 
 @app.route('/api/prompts/get-versions', methods=['GET'])
+@cache.cached(timeout=_PROMPTS_CACHE_TIMEOUT, key_prefix=_prompts_cache_key('get-versions'), response_filter=_is_cacheable_prompts_response)
 def get_prompt_versions():
     """Get all prompt versions from database."""
     try:
@@ -7941,43 +6517,28 @@ def get_prompt_versions():
         
         cursor = conn.cursor()
         
-        if prompt_type:
-            cursor.execute('''
-                SELECT id, version_name, prompt_type, prompt_content, version_letter, 
-                       endpoint_path, status, created_at, updated_at
-                FROM prompt_versions
-                WHERE prompt_type = %s AND version_letter != 'DEFAULT'
-                ORDER BY version_letter
-            ''', (prompt_type,))
-        else:
-            cursor.execute('''
-                SELECT id, version_name, prompt_type, prompt_content, version_letter, 
-                       endpoint_path, status, created_at, updated_at
-                FROM prompt_versions
-                WHERE version_letter != 'DEFAULT'
-                ORDER BY prompt_type, version_letter
-            ''')
-        
-        versions = []
-        for row in cursor.fetchall():
-            versions.append({
-                'id': row[0],
-                'version_name': row[1],
-                'prompt_type': row[2],
-                'prompt_content': row[3],
-                'version_letter': row[4],
-                'endpoint_path': row[5],
-                'status': row[6],
-                'created_at': row[7].isoformat() if row[7] else None,
-                'updated_at': row[8].isoformat() if row[8] else None
-            })
+        # Postgres builds the versions array itself (timestamps come out ISO 8601), and it is read
+        # as text so it goes into the response without a Python round-trip through dicts.
+        cursor.execute('''
+            SELECT COALESCE(json_agg(json_build_object(
+                       'id', id,
+                       'version_name', version_name,
+                       'prompt_type', prompt_type,
+                       'prompt_content', prompt_content,
+                       'version_letter', version_letter,
+                       'endpoint_path', endpoint_path,
+                       'status', status,
+                       'created_at', created_at,
+                       'updated_at', updated_at
+                   ) ORDER BY prompt_type, version_letter), '[]'::json)::text
+            FROM prompt_versions
+            WHERE version_letter != 'DEFAULT' AND (%s = '' OR prompt_type = %s)
+        ''', (prompt_type, prompt_type))
+        versions_json = cursor.fetchone()[0]
         
         conn.close()
         
-        return jsonify({
-            'status': 'success',
-            'versions': versions
-        })
+        return Response(f'{{"status":"success","versions":{versions_json}}}', mimetype='application/json')
         
     except Exception as e:
         logger.error(f"Error getting prompt versions: {e}")
@@ -7987,6 +6548,7 @@ def get_prompt_versions():
         }), 500
 
 @app.route('/api/prompts/get-stats', methods=['GET'])
+@cache.cached(timeout=_VERSION_STATS_CACHE_TIMEOUT, key_prefix=_version_stats_cache_key, response_filter=_is_cacheable_prompts_response)
 def get_prompt_version_stats():
     """Get open rate statistics for each prompt version endpoint."""
     try:
@@ -8003,24 +6565,17 @@ def get_prompt_version_stats():
                 'message': 'Database connection failed'
             }), 503
         
-        cursor = conn.cursor()
-        
         # Get stats for each version endpoint
         # Calculate: total sent, total opened, open rate
         # Only count emails that have a version_endpoint set (don't include NULL as default)
-        cursor.execute('''
+        # (et.id is the primary key, so plain COUNT(*) / FILTER counts each email once)
+        # The columns come back in their JSON types (bigint counts, float8 rate).
+        rows = fetch_all_dict(conn, '''
             SELECT 
                 et.version_endpoint as endpoint,
-                COUNT(DISTINCT et.id) as total_sent,
-                COUNT(DISTINCT CASE WHEN et.open_count > 0 THEN et.id END) as total_opened,
-                ROUND(
-                    CASE 
-                        WHEN COUNT(DISTINCT et.id) > 0 
-                        THEN (COUNT(DISTINCT CASE WHEN et.open_count > 0 THEN et.id END)::NUMERIC / COUNT(DISTINCT et.id)::NUMERIC) * 100
-                        ELSE 0 
-                    END::NUMERIC, 
-                    2
-                ) as open_rate
+                COUNT(*) as total_sent,
+                COUNT(*) FILTER (WHERE et.open_count > 0) as total_opened,
+                ROUND(100.0 * COUNT(*) FILTER (WHERE et.open_count > 0) / NULLIF(COUNT(*), 0), 2)::float8 as open_rate
             FROM email_tracking et
             WHERE et.version_endpoint IS NOT NULL
             GROUP BY et.version_endpoint
@@ -8028,39 +6583,75 @@ def get_prompt_version_stats():
         ''')
         
         stats = {}
-        for row in cursor.fetchall():
-            endpoint, total_sent, total_opened, open_rate = row
+        for row in rows:
+            endpoint = row.pop('endpoint')
             # Normalize endpoint to ensure exact match
             endpoint = endpoint.strip() if endpoint else '/api/workato/send-new-email'
-            stats[endpoint] = {
-                'total_sent': int(total_sent) if total_sent else 0,
-                'total_opened': int(total_opened) if total_opened else 0,
-                'open_rate': float(open_rate) if open_rate else 0.0
-            }
+            stats[endpoint] = dict(row)
         
-        # Also check what endpoints actually exist in the database for debugging
-        cursor.execute('''
-            SELECT DISTINCT version_endpoint, COUNT(*) 
-            FROM email_tracking 
-            GROUP BY version_endpoint
-            ORDER BY version_endpoint
-        ''')
-        endpoint_counts = {row[0]: row[1] for row in cursor.fetchall()}
-        logger.info(f"📊 Endpoints in database: {endpoint_counts}")
+        # Also check what endpoints actually exist in the database (debug only - a second full aggregation)
+        if logger.isEnabledFor(logging.DEBUG):
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT version_endpoint, COUNT(*) 
+                FROM email_tracking 
+                GROUP BY version_endpoint
+                ORDER BY version_endpoint
+            ''')
+            logger.debug("📊 Endpoints in database: %s", dict(cursor.fetchall()))
         
         conn.close()
         
         logger.info(f"📊 Stats calculated: {stats}")
         
-        return jsonify({
+        return json_response({
             'status': 'success',
             'stats': stats
         })
         
     except Exception as e:
-        logger.error(f"Error getting prompt version stats: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error getting prompt version stats")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+def _json_from_view(view):
+    """Call a JSON view function in the current request context and return its parsed body."""
+    rv = view()
+    response = rv[0] if isinstance(rv, tuple) else rv
+    return response.get_json()
+
+@app.route('/api/prompts/bootstrap', methods=['GET'])
+def get_prompts_bootstrap():
+    """Get prompts, prompt versions and version stats for the prompts UI in one response.
+
+    Each part is the body the matching /api/prompts/get, /get-versions and /get-stats
+    endpoint would return. The three loads run concurrently, and the response carries a
+    content-hash ETag so unchanged data is answered with a 304.
+    """
+    try:
+        views = (get_prompts.__wrapped__, get_prompt_versions, get_prompt_version_stats)
+        with ThreadPoolExecutor(max_workers=len(views)) as executor:
+            futures = [
+                executor.submit(copy_current_request_context(functools.partial(_json_from_view, view)))
+                for view in views
+            ]
+            prompts_data, versions_data, stats_data = (future.result() for future in futures)
+        
+        body = dumps_json_bytes({
+            'status': 'success',
+            'prompts': prompts_data,
+            'versions': versions_data,
+            'stats': stats_data
+        })
+        
+        response = Response(body, mimetype='application/json', headers={'Cache-Control': 'no-cache'})
+        response.set_etag(hashlib.blake2b(body, digest_size=16).hexdigest())
+        return response.make_conditional(request)
+        
+    except Exception as e:
+        logger.error(f"Error getting prompts bootstrap data: {e}")
         return jsonify({
             'status': 'error',
             'message': str(e)
@@ -8102,51 +6693,57 @@ def create_prompt_version():
         
         cursor = conn.cursor()
         
-        # Find the next available version letter (A, B, C, etc.)
-        cursor.execute('''
-            SELECT version_letter 
-            FROM prompt_versions 
-            WHERE prompt_type = %s 
-            ORDER BY version_letter
-        ''', (prompt_type,))
-        existing_versions = [row[0] for row in cursor.fetchall()]
-        
-        # Generate next version letter
-        version_letter = None
-        for letter in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ':
-            if letter not in existing_versions:
-                version_letter = letter
-                break
-        
-        if not version_letter:
-            conn.close()
-            return jsonify({
-                'status': 'error',
-                'message': 'Maximum number of versions reached (26 versions max)'
-            }), 400
-        
-        # Determine endpoint path
+        # Versioned endpoint path: the type's prefix + the letter (non-campaign-email has no
+        # versioned endpoints, so all its versions share the main path)
         if prompt_type == 'new-email':
-            endpoint_path = f'/api/workato/send-new-email-version-{version_letter.lower()}'
+            endpoint_prefix, fixed_endpoint_path = '/api/workato/send-new-email-version-', None
         elif prompt_type == 'reply-email':
-            endpoint_path = f'/api/workato/reply-to-emails-version-{version_letter.lower()}'
+            endpoint_prefix, fixed_endpoint_path = '/api/workato/reply-to-emails-version-', None
         else:  # non-campaign-email (no versioned endpoints for this type)
-            endpoint_path = f'/api/workato/check-non-campaign-emails'
+            endpoint_prefix, fixed_endpoint_path = None, '/api/workato/check-non-campaign-emails'
         
-        # Insert version into database
+        # Pick the next available version letter (A, B, C, etc.) and insert the version in one
+        # statement; no row comes back when all 26 letters are taken
         cursor.execute('''
+            WITH next_letter AS (
+                SELECT chr(65 + gs) AS version_letter
+                FROM generate_series(0, 25) gs
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM prompt_versions p
+                    WHERE p.prompt_type = %(prompt_type)s AND p.version_letter = chr(65 + gs)
+                )
+                ORDER BY gs
+                LIMIT 1
+            )
             INSERT INTO prompt_versions 
             (version_name, prompt_type, prompt_content, version_letter, endpoint_path, status)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            RETURNING id
-        ''', (version_name, prompt_type, prompt_content, version_letter, endpoint_path, 'draft'))
+            SELECT %(version_name)s, %(prompt_type)s, %(prompt_content)s, version_letter,
+                   COALESCE(%(endpoint_prefix)s || lower(version_letter), %(endpoint_path)s), 'draft'
+            FROM next_letter
+            RETURNING id, version_letter, endpoint_path
+        ''', {
+            'version_name': version_name,
+            'prompt_type': prompt_type,
+            'prompt_content': prompt_content,
+            'endpoint_prefix': endpoint_prefix,
+            'endpoint_path': fixed_endpoint_path
+        })
+        
+        row = cursor.fetchone()
+        if not row:
+            conn.close()
+            return jsonify({
+                'status': 'error',
+                'message': 'Maximum number of versions reached (26 versions max)'
+            }), 400
         
-        version_id = cursor.fetchone()[0]
+        version_id, version_letter, endpoint_path = row
         conn.commit()
         conn.close()
+        _invalidate_prompts_cache()
         
         # Store endpoint info (routes handled by catch-all)
-        create_versioned_endpoint(prompt_type, version_letter, endpoint_path, prompt_content)
+        create_versioned_endpoint(prompt_type, version_letter, endpoint_path, prompt_content, 'draft')
         
         logger.info(f"✅ Created prompt version: {version_name} ({version_letter}) with endpoint: {endpoint_path}")
         
@@ -8161,9 +6758,7 @@ def create_prompt_version():
         })
         
     except Exception as e:
-        logger.error(f"❌ Error creating prompt version: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error creating prompt version")
         return jsonify({
             'status': 'error',
             'message': f'Error creating prompt version: {str(e)}'
@@ -8198,13 +6793,15 @@ def update_prompt_version():
         
         cursor = conn.cursor()
         
-        # Get the existing version to get its details
+        # Update the prompt content, getting back the version details for the dynamic endpoint
         logger.info(f"📝 Updating prompt version with ID: {version_id}")
         cursor.execute('''
-            SELECT prompt_type, version_letter, endpoint_path, version_name
-            FROM prompt_versions
+            UPDATE prompt_versions
+            SET prompt_content = %s,
+                updated_at = CURRENT_TIMESTAMP
             WHERE id = %s
-        ''', (version_id,))
+            RETURNING prompt_type, version_letter, endpoint_path, version_name, status
+        ''', (prompt_content, version_id))
         
         row = cursor.fetchone()
         if not row:
@@ -8215,23 +6812,14 @@ def update_prompt_version():
                 'message': f'Prompt version with ID {version_id} not found'
             }), 404
         
-        logger.info(f"✅ Found prompt version: {row[3]} (ID: {version_id})")
-        
-        prompt_type, version_letter, endpoint_path, version_name = row
-        
-        # Update the prompt content in the database
-        cursor.execute('''
-            UPDATE prompt_versions
-            SET prompt_content = %s,
-                updated_at = CURRENT_TIMESTAMP
-            WHERE id = %s
-        ''', (prompt_content, version_id))
+        prompt_type, version_letter, endpoint_path, version_name, status = row
         
         conn.commit()
         conn.close()
+        _invalidate_prompts_cache()
         
         # Update the dynamic endpoint with the new prompt content
-        create_versioned_endpoint(prompt_type, version_letter, endpoint_path, prompt_content)
+        create_versioned_endpoint(prompt_type, version_letter, endpoint_path, prompt_content, status)
         
         logger.info(f"✅ Updated prompt version {version_id} ({version_letter}) with new content")
         logger.info(f"📝 Updated prompt content (first 200 chars): {prompt_content[:200]}...")
@@ -8245,9 +6833,7 @@ def update_prompt_version():
         })
         
     except Exception as e:
-        logger.error(f"❌ Error updating prompt version: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error updating prompt version")
         return jsonify({
             'status': 'error',
             'message': f'Error updating prompt version: {str(e)}'
@@ -8281,11 +6867,11 @@ def delete_prompt_version():
         
         cursor = conn.cursor()
         
-        # Get version info before deleting (for logging)
+        # Delete the version, getting back its details for logging and the endpoint cache
         cursor.execute('''
-            SELECT version_name, version_letter, endpoint_path, prompt_type
-            FROM prompt_versions
+            DELETE FROM prompt_versions
             WHERE id = %s
+            RETURNING version_name, version_letter, endpoint_path, prompt_type
         ''', (version_id,))
         
         row = cursor.fetchone()
@@ -8298,14 +6884,10 @@ def delete_prompt_version():
         
         version_name, version_letter, endpoint_path, prompt_type = row
         
-        # Delete the version from database
-        cursor.execute('''
-            DELETE FROM prompt_versions
-            WHERE id = %s
-        ''', (version_id,))
-        
         conn.commit()
         conn.close()
+        _invalidate_prompts_cache()
+        _dynamic_endpoints.pop(endpoint_path, None)
         
         logger.info(f"✅ Deleted prompt version {version_id} ({version_letter}): {version_name}")
         
@@ -8317,9 +6899,7 @@ def delete_prompt_version():
         })
         
     except Exception as e:
-        logger.error(f"❌ Error deleting prompt version: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error deleting prompt version")
         return jsonify({
             'status': 'error',
             'message': f'Error deleting prompt version: {str(e)}'
@@ -8327,16 +6907,20 @@ def delete_prompt_version():
 
 # Store dynamically created endpoints
 _dynamic_endpoints = {}
+_VERSIONED_PROMPT_CACHE_SECONDS = 30  # Re-check an active entry against the database after this long
 
-def create_versioned_endpoint(prompt_type, version_letter, endpoint_path, prompt_content):
+def create_versioned_endpoint(prompt_type, version_letter, endpoint_path, prompt_content, status):
     """Store versioned endpoint info (routes are handled by catch-all route)."""
     global _dynamic_endpoints
     
-    # Store for reference (no longer creating routes dynamically)
+    # Store for reference (no longer creating routes dynamically); active entries also serve
+    # the versioned endpoints' prompt lookups
     _dynamic_endpoints[endpoint_path] = {
         'prompt_type': prompt_type,
         'version_letter': version_letter,
-        'prompt_content': prompt_content
+        'prompt_content': prompt_content,
+        'status': status,
+        'loaded_at': time.monotonic()
     }
     
     logger.info(f"✅ Registered versioned endpoint info: {endpoint_path} (will be handled by catch-all route)")
@@ -8352,10 +6936,10 @@ def get_versioned_prompt_from_db(endpoint_path):
             return None
         
         cursor = conn.cursor()
-        cursor.execute('''
+        execute_prepared(cursor, 'get_versioned_prompt', '''
             SELECT prompt_type, prompt_content, version_letter
             FROM prompt_versions
-            WHERE endpoint_path = %s AND status = 'active'
+            WHERE endpoint_path = $1 AND status = 'active'
         ''', (endpoint_path,))
         
         row = cursor.fetchone()
@@ -8372,6 +6956,26 @@ def get_versioned_prompt_from_db(endpoint_path):
         logger.error(f"Error getting versioned prompt from DB: {e}")
         return None
 
+def get_versioned_prompt(endpoint_path):
+    """Get prompt content for an active versioned endpoint - from _dynamic_endpoints, else the database.
+
+    Status changes happen directly in the database, so an active entry is only trusted for
+    _VERSIONED_PROMPT_CACHE_SECONDS; a missing, inactive or expired entry is looked up again,
+    and dropped if the version is no longer active (deactivated or deleted).
+    """
+    version_info = _dynamic_endpoints.get(endpoint_path)
+    if (version_info and version_info['status'] == 'active'
+            and time.monotonic() - version_info['loaded_at'] < _VERSIONED_PROMPT_CACHE_SECONDS):
+        return version_info
+    
+    version_info = get_versioned_prompt_from_db(endpoint_path)
+    if version_info:
+        create_versioned_endpoint(version_info['prompt_type'], version_info['version_letter'],
+                                  endpoint_path, version_info['prompt_content'], 'active')
+    else:
+        _dynamic_endpoints.pop(endpoint_path, None)
+    return version_info
+
 # Load existing versions and create endpoints on startup
 def load_prompt_versions():
     """Load existing prompt versions from database and create their endpoints."""
@@ -8392,7 +6996,7 @@ def load_prompt_versions():
         
         for row in cursor.fetchall():
             prompt_type, version_letter, endpoint_path, prompt_content = row
-            create_versioned_endpoint(prompt_type, version_letter, endpoint_path, prompt_content)
+            create_versioned_endpoint(prompt_type, version_letter, endpoint_path, prompt_content, 'active')
             logger.info(f"✅ Loaded existing version endpoint: {endpoint_path}")
         
         conn.close()
@@ -8402,28 +7006,22 @@ def load_prompt_versions():
 # Load versions on startup (just store info, routes handled by catch-all)
 load_prompt_versions()
 
-# Catch-all route for versioned send-new-email endpoints
-@app.route('/api/workato/send-new-email-version-<version_letter>', methods=['POST'])
-def handle_versioned_send_new_email(version_letter):
-    """Handle versioned send-new-email endpoints by looking up prompt from database."""
-    endpoint_path = f'/api/workato/send-new-email-version-{version_letter.lower()}'
-    
-    # Get prompt from database
-    version_info = get_versioned_prompt_from_db(endpoint_path)
-    if not version_info:
-        return jsonify({
-            "status": "error",
-            "message": f"Version {version_letter.upper()} not found or not active",
-            "timestamp": datetime.datetime.now().isoformat()
-        }), 404
-    
-    prompt_content = version_info['prompt_content']
-    version_letter_upper = version_info['version_letter']
-    
+def _versioned_send_error(e):
+    """Error result for a versioned send-new-email contact."""
+    logger.exception("❌ Error in versioned send-new-email endpoint")
+    return {
+        "status": "error",
+        "message": f"Error sending email: {str(e)}",
+        "timestamp": datetime.datetime.now().isoformat()
+    }, 500
+
+def _prepare_versioned_new_email(data, endpoint_path, version_letter_upper, prompt_content):
+    """Run the already-sent check and generate one versioned new email for a contact payload.
+
+    Returns (draft, None) when the email is ready for _deliver_versioned_new_email, or
+    (None, (response_payload, http_status)) when the contact is finished (skipped or failed).
+    """
     try:
-        # Get the same logic as workato_send_new_email but with custom prompt
-        data = request.get_json() if request.is_json else {}
-        
         # Extract all the same fields as the original endpoint
         contact_name = data.get('contact_name', '')
         contact_email = data.get('contact_email', '')
@@ -8456,16 +7054,16 @@ def handle_versioned_send_new_email(version_letter):
         sender_name = "Jake Morgan"
         
         if not contact_email:
-            return jsonify({
+            return None, ({
                 "status": "error",
                 "message": "Missing required 'contact_email' parameter",
                 "timestamp": datetime.datetime.now().isoformat()
-            }), 400
+            }, 400)
         
         # Check if email has already been sent
         has_been_sent, reason = check_if_email_already_sent(contact_email, activities)
         if has_been_sent:
-            return jsonify({
+            return None, ({
                 "status": "skipped",
                 "message": f"Email already sent to this contact - {reason}",
                 "timestamp": datetime.datetime.now().isoformat(),
@@ -8473,7 +7071,7 @@ def handle_versioned_send_new_email(version_letter):
                 "account": account_name,
                 "reason": reason,
                 "emails_sent": 0
-            }), 200
+            }, 200)
         
         # Log which version is being used
         logger.info(f"📝 PROMPT VERSION BEING USED:")
@@ -8507,11 +7105,26 @@ def handle_versioned_send_new_email(version_letter):
         # Convert newlines to <br> for HTML (plain format without template wrapper)
         formatted_email = email_content_with_signature.replace("\n", "<br>")
 
+        return {
+            "contact_email": contact_email,
+            "contact_name": contact_name,
+            "account_name": account_name,
+            "subject_line": subject_line,
+            "email_content": email_content,
+            "formatted_email": formatted_email
+        }, None
+        
+    except Exception as e:
+        return None, _versioned_send_error(e)
+
+def _deliver_versioned_new_email(draft, endpoint_path, version_letter_upper):
+    """Send a draft from _prepare_versioned_new_email; returns (response_payload, http_status)."""
+    try:
         email_result = send_email(
-            to_email=contact_email,
-            merchant_name=account_name,  # Use account_name (company name), not contact_name (person name)
-            subject_line=subject_line,
-            email_content=formatted_email,
+            to_email=draft["contact_email"],
+            merchant_name=draft["account_name"],  # Use account_name (company name), not contact_name (person name)
+            subject_line=draft["subject_line"],
+            email_content=draft["formatted_email"],
             campaign_name="MSS Signed But Not Activated Campaign",
             version_endpoint=endpoint_path
         )
@@ -8519,42 +7132,120 @@ def handle_versioned_send_new_email(version_letter):
         email_status = email_result['status'] if isinstance(email_result, dict) else email_result
         tracking_info = f" | Tracking ID: {email_result.get('tracking_id', 'N/A')}" if isinstance(email_result, dict) else ""
         
-        clean_email_body = email_content.replace('\n', ' ').replace('\r', ' ').strip()
-        import re
-        clean_email_body = re.sub(r'\s+', ' ', clean_email_body)
+        # Clean email content - collapse line breaks and runs of whitespace
+        clean_email_body = _WHITESPACE_RE.sub(' ', draft["email_content"]).strip()
         
-        return jsonify({
+        return {
             "status": "success",
             "message": "Personalized email sent successfully",
             "timestamp": datetime.datetime.now().isoformat(),
-            "contact": contact_name,
-            "account": account_name,
+            "contact": draft["contact_name"],
+            "account": draft["account_name"],
             "email_status": email_status + tracking_info,
-            "subject": subject_line,
+            "subject": draft["subject_line"],
             "email_body": clean_email_body,
             "tracking_id": email_result.get('tracking_id') if isinstance(email_result, dict) else None,
             "tracking_url": email_result.get('tracking_url') if isinstance(email_result, dict) else None,
             "emails_sent": 1,
             "version": version_letter_upper
-        })
+        }, 200
         
     except Exception as e:
-        logger.error(f"❌ Error in versioned send-new-email endpoint: {e}")
-        import traceback
-        traceback.print_exc()
+        return _versioned_send_error(e)
+
+def _send_versioned_new_email(data, endpoint_path, version_letter_upper, prompt_content):
+    """Generate and send one versioned new email for a contact payload; returns (response_payload, http_status)."""
+    draft, result = _prepare_versioned_new_email(data, endpoint_path, version_letter_upper, prompt_content)
+    if draft is None:
+        return result
+    return _deliver_versioned_new_email(draft, endpoint_path, version_letter_upper)
+
+# Contacts of a batched versioned send checked/generated concurrently. The sends themselves stay
+# sequential so send_email's pacing delay between Gmail sends still applies.
+VERSIONED_SEND_MAX_WORKERS = 8
+
+# Catch-all route for versioned send-new-email endpoints
+@app.route('/api/workato/send-new-email-version-<version_letter>', methods=['POST'])
+def handle_versioned_send_new_email(version_letter):
+    """Handle versioned send-new-email endpoints by looking up prompt from database.
+
+    Accepts one contact object, or {"contacts": [...]} to send a batch in one request - the
+    contacts' emails are generated concurrently, then sent one at a time in input order, and the
+    response carries one result per contact.
+    """
+    endpoint_path = f'/api/workato/send-new-email-version-{version_letter.lower()}'
+    
+    # Get prompt (in-memory endpoint info, falling back to the database)
+    version_info = get_versioned_prompt(endpoint_path)
+    if not version_info:
         return jsonify({
             "status": "error",
-            "message": f"Error sending email: {str(e)}",
+            "message": f"Version {version_letter.upper()} not found or not active",
             "timestamp": datetime.datetime.now().isoformat()
-        }), 500
+        }), 404
+    
+    prompt_content = version_info['prompt_content']
+    version_letter_upper = version_info['version_letter']
+    
+    # Get the same logic as workato_send_new_email but with custom prompt
+    data = request.get_json() if request.is_json else {}
+    contacts = data.get('contacts') if isinstance(data, dict) else None
+    if not isinstance(contacts, list):
+        payload, status_code = _send_versioned_new_email(data, endpoint_path, version_letter_upper, prompt_content)
+        return json_response(payload, status_code)
+    
+    # Batch: each contact is checked and generated on a worker thread. A contact listed twice is only
+    # emailed once - concurrent checks for the same address would both pass the already-sent check.
+    results = [None] * len(contacts)
+    pending = []
+    seen_emails = set()
+    for index, contact in enumerate(contacts):
+        if not isinstance(contact, dict):
+            contact = {}
+        contact_email = str(contact.get('contact_email', '')).lower().strip()
+        if contact_email and contact_email in seen_emails:
+            results[index] = {
+                "status": "skipped",
+                "message": "Duplicate contact in this batch",
+                "timestamp": datetime.datetime.now().isoformat(),
+                "contact": contact.get('contact_name', ''),
+                "account": contact.get('account_name', ''),
+                "reason": "Duplicate contact in this batch",
+                "emails_sent": 0
+            }
+            continue
+        seen_emails.add(contact_email)
+        pending.append((index, contact))
+    
+    if pending:
+        with ThreadPoolExecutor(max_workers=min(VERSIONED_SEND_MAX_WORKERS, len(pending))) as executor:
+            prepared = list(executor.map(
+                lambda item: _prepare_versioned_new_email(item[1], endpoint_path, version_letter_upper, prompt_content),
+                pending
+            ))
+        # Send one at a time, in input order
+        for (index, _), (draft, result) in zip(pending, prepared):
+            if draft is None:
+                results[index] = result[0]
+            else:
+                results[index] = _deliver_versioned_new_email(draft, endpoint_path, version_letter_upper)[0]
+    
+    return json_response({
+        "status": "success",
+        "message": f"Processed {len(contacts)} contact(s)",
+        "timestamp": datetime.datetime.now().isoformat(),
+        "emails_sent": sum(result.get("emails_sent", 0) for result in results),
+        "version": version_letter_upper,
+        "results": results
+    })
 
 @app.route('/api/workato/reply-to-emails-version-<version_letter>', methods=['POST'])
 def handle_versioned_reply_to_emails(version_letter):
     """Handle versioned reply-to-emails endpoints by looking up prompt from database."""
     endpoint_path = f'/api/workato/reply-to-emails-version-{version_letter.lower()}'
     
-    # Get prompt from database
-    version_info = get_versioned_prompt_from_db(endpoint_path)
+    # Get prompt (in-memory endpoint info, falling back to the database)
+    version_info = get_versioned_prompt(endpoint_path)
     if not version_info:
         return jsonify({
             "status": "error",
@@ -8568,6 +7259,8 @@ def handle_versioned_reply_to_emails(version_letter):
         "timestamp": datetime.datetime.now().isoformat()
     }), 501
 
+TEST_MERCHANT_ID = 1  # Fixed row id the single test merchant is saved under
+
 @app.route('/api/test-merchants/save', methods=['POST', 'GET'])
 def save_test_merchant():
     """
@@ -8631,10 +7324,6 @@ def save_test_merchant():
         
         cursor = conn.cursor()
         
-        # Check if test merchant already exists (we'll only keep one test merchant)
-        cursor.execute('SELECT id FROM test_merchants LIMIT 1')
-        existing = cursor.fetchone()
-        
         # Map fields from send-new-email format if merchant_name is not provided
         # This allows using the same request body as /api/workato/send-new-email
         if 'merchant_name' not in data and 'contact_name' in data:
@@ -8682,39 +7371,30 @@ def save_test_merchant():
         
         last_activity = data.get('last_activity', 'Recent')
         
-        if existing:
-            # Update existing test merchant
-            cursor.execute('''
-                UPDATE test_merchants SET
-                    merchant_name = %s,
-                    contact_email = %s,
-                    contact_title = %s,
-                    merchant_industry = %s,
-                    merchant_website = %s,
-                    account_description = %s,
-                    account_revenue = %s,
-                    account_employees = %s,
-                    account_location = %s,
-                    account_gmv = %s,
-                    last_activity = %s,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = %s
-            ''', (merchant_name, contact_email, contact_title, merchant_industry, merchant_website,
-                  account_description, account_revenue, account_employees, account_location,
-                  account_gmv, last_activity, existing[0]))
-            logger.info(f"✅ Updated test merchant: {merchant_name}")
-        else:
-            # Insert new test merchant
-            cursor.execute('''
-                INSERT INTO test_merchants 
-                (merchant_name, contact_email, contact_title, merchant_industry, merchant_website,
-                 account_description, account_revenue, account_employees, account_location,
-                 account_gmv, last_activity)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ''', (merchant_name, contact_email, contact_title, merchant_industry, merchant_website,
-                  account_description, account_revenue, account_employees, account_location,
-                  account_gmv, last_activity))
-            logger.info(f"✅ Created test merchant: {merchant_name}")
+        # We only keep one test merchant: a single upsert on its fixed row id (readers take the
+        # most recently updated row)
+        execute_prepared(cursor, 'upsert_test_merchant', '''
+            INSERT INTO test_merchants 
+            (id, merchant_name, contact_email, contact_title, merchant_industry, merchant_website,
+             account_description, account_revenue, account_employees, account_location,
+             account_gmv, last_activity)
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
+            ON CONFLICT (id) DO UPDATE SET
+                merchant_name = EXCLUDED.merchant_name,
+                contact_email = EXCLUDED.contact_email,
+                contact_title = EXCLUDED.contact_title,
+                merchant_industry = EXCLUDED.merchant_industry,
+                merchant_website = EXCLUDED.merchant_website,
+                account_description = EXCLUDED.account_description,
+                account_revenue = EXCLUDED.account_revenue,
+                account_employees = EXCLUDED.account_employees,
+                account_location = EXCLUDED.account_location,
+                account_gmv = EXCLUDED.account_gmv,
+                last_activity = EXCLUDED.last_activity,
+                updated_at = CURRENT_TIMESTAMP
+        ''', (TEST_MERCHANT_ID, merchant_name, contact_email, contact_title, merchant_industry, merchant_website,
+              account_description, account_revenue, account_employees, account_location,
+              account_gmv, last_activity))
         
         conn.commit()
         conn.close()
@@ -8909,9 +7589,7 @@ def generate_sample_response():
         })
         
     except Exception as e:
-        logger.error(f"Error generating sample response: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.exception("Error generating sample response")
         return jsonify({
             'status': 'error',
             'message': str(e)
@@ -9037,6 +7715,7 @@ def track_email_send():
 
         conn.commit()
         conn.close()
+        _invalidate_version_stats_cache()
         
         logger.info(f"📧 Email send tracked: {tracking_id} -> {recipient_email}")
         
@@ -9127,6 +7806,7 @@ def track_pixel(tracking_id):
                         ''', (tracking_id,))
                         
                         conn.commit()
+                        _invalidate_version_stats_cache()
                         logger.info(f"✅ Real email opened! Tracking ID: {tracking_id}")
                     else:
                         conn.commit()
@@ -11032,8 +9712,8 @@ def check_if_email_already_sent(contact_email, activities=None):
     """
     contact_email_lower = contact_email.lower().strip()
     
-    # Parse and normalize activities
-    activities_list = parse_activities(activities)
+    # Parse and normalize activities (nothing to do for a missing/empty list)
+    activities_list = parse_activities(activities) if activities else []
     normalized_activities = [normalize_activity(activity) for activity in activities_list]
     
     # Check 1: Look through activities list for email-related activities
@@ -11092,29 +9772,21 @@ def check_if_email_already_sent(contact_email, activities=None):
             conn = get_db_connection()
             if conn:
                 cursor = conn.cursor()
-                # Check if we've sent any emails to this recipient
-                cursor.execute('''
-                    SELECT COUNT(*), MAX(sent_at)
+                # Most recent email to this recipient plus the total count, in one lookup on
+                # idx_email_tracking_recipient_lower_sent (the window count is taken before LIMIT)
+                execute_prepared(cursor, 'latest_email_sent_to', '''
+                    SELECT COUNT(*) OVER (), sent_at, campaign_name
                     FROM email_tracking
-                    WHERE LOWER(recipient_email) = %s
+                    WHERE LOWER(recipient_email) = $1
+                    ORDER BY sent_at DESC
+                    LIMIT 1
                 ''', (contact_email_lower,))
                 
                 result = cursor.fetchone()
                 
-                if result and result[0] > 0:
-                    count = result[0]
-                    last_sent = result[1]
-                    
-                    # Get the campaign name from the most recent email
-                    cursor.execute('''
-                        SELECT campaign_name
-                        FROM email_tracking
-                        WHERE LOWER(recipient_email) = %s
-                        ORDER BY sent_at DESC
-                        LIMIT 1
-                    ''', (contact_email_lower,))
-                    campaign_result = cursor.fetchone()
-                    campaign = campaign_result[0] if campaign_result else "Unknown"
+                if result:
+                    count, last_sent, campaign = result
+                    campaign = campaign or "Unknown"
                     
                     conn.close()
                     logger.info(f"📧 Found {count} previously sent email(s) to {contact_email} in database (last sent: {last_sent})")
@@ -11778,11 +10450,8 @@ def workato_send_new_email():
         
         logger.info(f"✅ Personalized email sent successfully to {contact_name}")
         
-        # Clean email content - remove line breaks and extra whitespace
-        clean_email_body = email_content.replace('\n', ' ').replace('\r', ' ').strip()
-        # Remove multiple spaces
-        import re
-        clean_email_body = re.sub(r'\s+', ' ', clean_email_body)
+        # Clean email content - collapse line breaks and runs of whitespace
+        clean_email_body = _WHITESPACE_RE.sub(' ', email_content).strip()
         
         return jsonify({
             "status": "success",
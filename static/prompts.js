@@ -0,0 +1,793 @@
+// Verbose console logging, enabled with ?debug=1
+const DEBUG = /[?&]debug=1/.test(location.search);
+
+let currentPromptType = 'new-email';
+let currentTab = 'all';
+let promptsData = {
+    'new-email': [],
+    'reply-email': [],
+    'voice-guidelines': []
+};
+let currentEditingPrompt = null;
+let variantStats = {};
+let promptCounts = {};
+let promptsIndex = {};
+
+// Elements the hot paths touch, looked up once (the script runs after the markup is parsed)
+const DOM = {};
+['prompts-table-body', 'table-container-root', 'all-count', 'active-count', 'draft-count', 'modal-title', 'modal-textarea', 'edit-modal', 'test-results-panel', 'test-results-content', 'test-reply-input', 'test-reply-input-section', 'test-merchant-content', 'sample-results', 'sample-output', 'sample-prompt-type', 'conversation_context', 'custom-prompt-content', 'conversation-context-section', 'toast', 'confirm-modal', 'confirm-message'].forEach(id => {
+    DOM[id.replace(/-/g, '_')] = document.getElementById(id);
+});
+
+// Non-blocking replacements for alert() / confirm(), so pending requests and rendering keep going
+let toastTimer = null;
+function showToast(message, kind = 'success') {
+    DOM.toast.textContent = message;
+    DOM.toast.classList.toggle('toast-error', kind === 'error');
+    DOM.toast.classList.add('visible');
+    clearTimeout(toastTimer);
+    toastTimer = setTimeout(() => DOM.toast.classList.remove('visible'), kind === 'error' ? 4000 : 2000);
+}
+
+let resolveConfirm = null;
+function showConfirm(message) {
+    resolveConfirm?.(false);
+    DOM.confirm_message.textContent = message;
+    DOM.confirm_modal.classList.add('active');
+    return new Promise(resolve => { resolveConfirm = resolve; });
+}
+
+DOM.confirm_modal.addEventListener('click', (e) => {
+    const button = e.target.closest('button[data-confirm]');
+    if (!button) return;
+    DOM.confirm_modal.classList.remove('active');
+    resolveConfirm?.(button.dataset.confirm === 'true');
+    resolveConfirm = null;
+});
+
+const EMPTY_STATS = Object.freeze({ total_sent: 0, total_opened: 0, open_rate: 0 });
+
+let bootstrapEtag = null;
+let refreshController = null;
+
+function applyStats(data) {
+    DEBUG && console.log('Stats API response:', data);
+    if (data.status === 'success') {
+        variantStats = data.stats || {};
+        DEBUG && console.log('Stats loaded into variantStats:', variantStats);
+    } else {
+        console.error('Stats API returned error:', data);
+        variantStats = {};
+    }
+}
+
+// Attach the display strings for a prompt's open-rate stats, so renders only read them
+function decoratePrompt(prompt) {
+    const stats = variantStats[(prompt.endpoint || '/api/workato/send-new-email').trim()] || EMPTY_STATS;
+    prompt._rate = `${(stats.open_rate || 0).toFixed(1)}%`;
+    prompt._counts = `${stats.total_opened || 0}/${stats.total_sent || 0} opened`;
+}
+
+// Tab counts and id -> prompt index for a prompt type, rebuilt in one pass whenever its list
+// changes (not on every render / click)
+function indexPrompts(type) {
+    const counts = { all: 0, active: 0, draft: 0 };
+    const index = new Map();
+    (promptsData[type] || []).forEach(prompt => {
+        index.set(prompt.id, prompt);
+        counts.all++;
+        if (prompt.status === 'active') counts.active++;
+        else if (prompt.status === 'draft') counts.draft++;
+    });
+    promptCounts[type] = counts;
+    promptsIndex[type] = index;
+}
+
+function findPrompt(promptId) {
+    return promptsIndex[currentPromptType]?.get(promptId);
+}
+
+function decoratePrompts() {
+    Object.values(promptsData).forEach(prompts => prompts.forEach(decoratePrompt));
+    promptCounts = {};
+    promptsIndex = {};
+    Object.keys(promptsData).forEach(indexPrompts);
+}
+
+// Reload prompts, versions and stats in one request, then precompute their display strings.
+// The server answers 304 when nothing changed since the last load, and the current data is kept.
+// Starting a new refresh aborts the one in flight, so only the latest request applies its data.
+// Resolves to false when this refresh was superseded (callers then leave rendering to the newer one).
+async function refreshAll() {
+    if (refreshController) {
+        refreshController.abort();
+    }
+    const controller = new AbortController();
+    refreshController = controller;
+    try {
+        const response = await fetch('/api/prompts/bootstrap', {
+            headers: bootstrapEtag ? { 'If-None-Match': bootstrapEtag } : {},
+            signal: controller.signal
+        });
+        if (response.status === 304) {
+            return true;
+        }
+        if (!response.ok) {
+            console.error('Failed to fetch prompts:', response.status, response.statusText);
+        }
+        const data = await response.json();
+        applyPrompts(data.prompts || {}, data.versions || {});
+        applyStats(data.stats || {});
+        bootstrapEtag = response.ok ? response.headers.get('ETag') : null;
+    } catch (error) {
+        if (error.name === 'AbortError') {
+            return false;
+        }
+        console.error('Error loading prompts:', error);
+        // Initialize with empty data structure on error
+        promptsData = {
+            'new-email': [],
+            'reply-email': [],
+            'non-campaign-email': [],
+            'voice-guidelines': []
+        };
+        variantStats = {};
+        bootstrapEtag = null;
+    } finally {
+        if (refreshController === controller) {
+            refreshController = null;
+        }
+    }
+    decoratePrompts();
+    return true;
+}
+
+// Coalesce render requests into one renderTable per animation frame, so rapid tab / type
+// clicks only render the final state
+let renderPending = false;
+function scheduleRender() {
+    if (renderPending) return;
+    renderPending = true;
+    requestAnimationFrame(() => {
+        renderPending = false;
+        renderTable();
+    });
+}
+
+function selectPromptType(type) {
+    currentPromptType = type;
+    document.querySelectorAll('.prompt-type-item').forEach(item => {
+        item.classList.toggle('active', item.dataset.type === type);
+    });
+
+    // Close test panel when switching prompts
+    const testPanel = DOM.test_results_panel;
+    if (testPanel) {
+        testPanel.style.display = 'none';
+    }
+
+    // Show/hide content areas
+    const tableContainer = DOM.table_container_root;
+    const testMerchantContent = DOM.test_merchant_content;
+
+    DEBUG && console.log('Switching to prompt type:', type);
+    DEBUG && console.log('Table container found:', !!tableContainer);
+    DEBUG && console.log('Test merchant content found:', !!testMerchantContent);
+
+    if (type === 'test-merchant') {
+        if (tableContainer) {
+            tableContainer.style.display = 'none';
+            DEBUG && console.log('Hiding table container');
+        }
+        if (testMerchantContent) {
+            testMerchantContent.style.display = 'block';
+            DEBUG && console.log('Showing test merchant content');
+            loadTestMerchant();
+        }
+    } else {
+        if (tableContainer) {
+            tableContainer.style.display = 'flex';
+            DEBUG && console.log('Showing table container');
+        }
+        if (testMerchantContent) {
+            testMerchantContent.style.display = 'none';
+            DEBUG && console.log('Hiding test merchant content');
+        }
+
+        // Always reload prompts when switching types
+        DEBUG && console.log('Loading prompts for type:', type);
+        refreshAll().then(applied => {
+            if (!applied) return;
+            DEBUG && console.log('Reloaded prompts and stats for type:', type);
+            DEBUG && console.log('Prompts for', type, ':', promptsData[type]);
+            scheduleRender();
+        }).catch(error => {
+            console.error('Error reloading prompts:', error);
+            scheduleRender(); // Still try to render with existing data
+        });
+    }
+}
+
+function selectTab(tab) {
+    currentTab = tab;
+    document.querySelectorAll('.tab').forEach(t => t.classList.toggle('active', t.dataset.tab === tab));
+    scheduleRender();
+}
+
+// One delegated click listener per container instead of an inline handler per element
+document.querySelector('.version-sidebar').addEventListener('click', (e) => {
+    const item = e.target.closest('.prompt-type-item');
+    if (item) selectPromptType(item.dataset.type);
+});
+
+document.querySelector('.tabs').addEventListener('click', (e) => {
+    const tab = e.target.closest('.tab');
+    if (tab) selectTab(tab.dataset.tab);
+});
+
+const rowActions = { edit: openEditModal, test: testPrompt, delete: deletePrompt };
+DOM.prompts_table_body.addEventListener('click', (e) => {
+    const button = e.target.closest('button[data-action]');
+    if (!button) return;
+    rowActions[button.dataset.action](Number(button.closest('tr').dataset.id));
+});
+
+// Default prompt of each type: API field it comes from, endpoint, env key and empty-preview text
+const PROMPT_META = [
+    { type: 'new-email', source: 'new_email_prompt', name: 'Default Version', endpoint: '/api/workato/send-new-email', key: 'NEW_EMAIL_PROMPT_TEMPLATE', placeholder: 'Default new email prompt template...' },
+    { type: 'reply-email', source: 'reply_email_prompt', name: 'Default Version', endpoint: '/api/workato/reply-to-emails', key: 'REPLY_EMAIL_PROMPT_TEMPLATE', placeholder: 'Default reply email prompt template...' },
+    { type: 'non-campaign-email', source: 'non_campaign_email_prompt', name: 'Default Version', endpoint: '/api/workato/check-non-campaign-emails', key: 'NON_CAMPAIGN_EMAIL_PROMPT_TEMPLATE', placeholder: 'Default non-campaign email prompt template...' },
+    { type: 'voice-guidelines', source: 'voice_guidelines', name: 'Default Guidelines', endpoint: 'Global', key: 'AFFIRM_VOICE_GUIDELINES', placeholder: 'Default voice guidelines...' }
+];
+
+// Table entry for a prompt version row from the database
+function versionToPrompt(version) {
+    return {
+        id: 1000 + version.id, // Use high IDs for versions (table rows only; keeps them clear of the default prompts)
+        version_id: version.id,
+        name: version.version_name,
+        preview: (version.prompt_content || '').substring(0, 100) || 'No preview...',
+        status: version.status || 'draft',
+        endpoint: version.endpoint_path,
+        key: `${version.prompt_type.toUpperCase().replace('-', '_')}_PROMPT_TEMPLATE_${version.version_letter}`,
+        content: version.prompt_content || '',
+        version_letter: version.version_letter
+    };
+}
+
+function applyPrompts(promptsData_result, versionsData) {
+    DEBUG && console.log('Prompts API response:', promptsData_result);
+    DEBUG && console.log('Versions API response:', versionsData);
+
+    if (promptsData_result.status === 'success') {
+        // Start with default versions
+        promptsData = Object.fromEntries(PROMPT_META.map(meta => {
+            const content = promptsData_result.prompts[meta.source] || '';
+            return [meta.type, [
+                { id: 1, name: meta.name, preview: content.substring(0, 100) || meta.placeholder, status: 'active', endpoint: meta.endpoint, key: meta.key, content: content, version_letter: null }
+            ]];
+        }));
+
+        // Add versions from database
+        if (versionsData.status === 'success' && versionsData.versions && Array.isArray(versionsData.versions)) {
+            versionsData.versions.forEach((version, idx) => {
+                const versionData = versionToPrompt(version);
+
+                if (version.prompt_type === 'new-email') {
+                    promptsData['new-email'].push(versionData);
+                } else if (version.prompt_type === 'reply-email') {
+                    promptsData['reply-email'].push(versionData);
+                } else if (version.prompt_type === 'non-campaign-email') {
+                    promptsData['non-campaign-email'].push(versionData);
+                }
+            });
+        }
+
+        DEBUG && console.log('Loaded prompts data:', promptsData);
+    } else {
+        console.error('Failed to load prompts:', promptsData_result);
+        // Initialize with empty data structure
+        promptsData = {
+            'new-email': [],
+            'reply-email': [],
+            'non-campaign-email': [],
+            'voice-guidelines': []
+        };
+    }
+}
+
+const rowTemplate = document.getElementById('row-tmpl').content;
+
+// Build one table row from the row template - fields are set as text, never parsed as HTML
+function buildRow(prompt, index) {
+    const row = rowTemplate.firstElementChild.cloneNode(true);
+    row.dataset.id = prompt.id;
+    const status = prompt.status || 'draft';
+
+    row.querySelector('.row-idx').textContent = String(index + 1).padStart(2, '0');
+    row.querySelector('.prompt-variant-name').textContent = prompt.name || 'Unnamed';
+    row.querySelector('.prompt-preview').textContent = `${prompt.preview || 'No preview available'}...`;
+    const badge = row.querySelector('.status-badge');
+    badge.classList.add(`status-${status}`);
+    badge.textContent = status.charAt(0).toUpperCase() + status.slice(1);
+    row.querySelector('.row-endpoint').textContent = prompt.endpoint || 'N/A';
+    row.querySelector('.row-rate').textContent = prompt._rate;
+    row.querySelector('.row-counts').textContent = prompt._counts;
+
+    // Row buttons are handled by the delegated listener on the table body
+    if (prompt.version_letter) {
+        row.querySelector('.row-na').remove();
+    } else {
+        row.querySelector('[data-action="delete"]').remove();
+    }
+    return row;
+}
+
+// Rebuild the table row of a single prompt in place, keeping its position
+function updateRow(prompt) {
+    const row = document.querySelector(`#prompts-table-body tr[data-id="${prompt.id}"]`);
+    if (!row) {
+        renderTable();
+        return;
+    }
+    row.replaceWith(buildRow(prompt, Array.prototype.indexOf.call(row.parentNode.children, row)));
+}
+
+function renderTable() {
+    const tbody = DOM.prompts_table_body;
+    if (!tbody) {
+        console.error('Table body not found!');
+        return;
+    }
+
+    const prompts = promptsData[currentPromptType] || [];
+
+    const filtered = currentTab === 'all' ? prompts : prompts.filter(p => p.status === currentTab);
+
+    if (filtered.length === 0) {
+        const td = document.createElement('td');
+        td.colSpan = 9;
+        td.style.cssText = 'text-align: center; padding: 40px; color: #6b7280;';
+        td.textContent = `No prompts found. ${prompts.length === 0 ? 'Click "+ Create Version" to create your first prompt version.' : 'Try selecting a different tab.'}`;
+        const tr = document.createElement('tr');
+        tr.appendChild(td);
+        tbody.replaceChildren(tr);
+    } else {
+        // Clone the row template per prompt and commit all rows in one DOM operation
+        const frag = document.createDocumentFragment();
+        filtered.forEach((prompt, index) => frag.appendChild(buildRow(prompt, index)));
+        tbody.replaceChildren(frag);
+    }
+
+    // Update counts
+    const counts = promptCounts[currentPromptType] || { all: 0, active: 0, draft: 0 };
+    DOM.all_count.textContent = counts.all;
+    DOM.active_count.textContent = counts.active;
+    DOM.draft_count.textContent = counts.draft;
+}
+
+function openEditModal(promptId) {
+    const prompt = findPrompt(promptId);
+    if (!prompt) return;
+
+    currentEditingPrompt = prompt;
+    DOM.modal_title.textContent = `Edit: ${prompt.name}`;
+    DOM.modal_textarea.value = prompt.content || '';
+    DOM.edit_modal.classList.add('active');
+}
+
+function closeModal() {
+    DOM.edit_modal.classList.remove('active');
+    currentEditingPrompt = null;
+}
+
+async function savePromptFromModal() {
+    if (!currentEditingPrompt) return;
+
+    const content = DOM.modal_textarea.value.trim();
+    if (!content) {
+        showToast('Prompt cannot be empty', 'error');
+        return;
+    }
+
+    try {
+        // If it's a version (has version_letter), update via version endpoint
+        if (currentEditingPrompt.version_letter) {
+            // Extract the real version ID from the database
+            const versionId = currentEditingPrompt.version_id;
+
+            const response = await fetch('/api/prompts/update-version', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ 
+                    version_id: versionId,
+                    prompt_content: content 
+                })
+            });
+
+            const data = await response.json();
+            if (data.status === 'success') {
+                sampleCache.clear();
+                // Patch the edited row locally instead of reloading every prompt
+                currentEditingPrompt.content = content;
+                currentEditingPrompt.preview = content.substring(0, 100);
+                updateRow(currentEditingPrompt);
+                closeModal();
+                showToast('✅ Version prompt saved successfully!');
+            } else {
+                showToast('❌ Error: ' + data.message, 'error');
+            }
+            return;
+        }
+
+        const response = await fetch('/api/prompts/update', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ key: currentEditingPrompt.key, value: content })
+        });
+
+        const data = await response.json();
+        if (data.status === 'success') {
+            sampleCache.clear();
+            // Patch the edited row locally instead of reloading every prompt
+            currentEditingPrompt.content = content;
+            currentEditingPrompt.preview = content.substring(0, 100);
+            updateRow(currentEditingPrompt);
+            closeModal();
+            showToast('✅ Prompt saved successfully!');
+        } else {
+            showToast('❌ Error: ' + data.message, 'error');
+        }
+    } catch (error) {
+        showToast('❌ Error saving prompt: ' + error.message, 'error');
+    }
+}
+
+async function createNewVersion() {
+    if (currentPromptType === 'voice-guidelines') {
+        showToast('Cannot create versions for voice guidelines', 'error');
+        return;
+    }
+
+    const versionName = prompt('Enter version name:');
+    if (!versionName) return;
+
+    const promptContent = prompt('Enter prompt content (or leave empty to edit later):');
+
+    try {
+        const response = await fetch('/api/prompts/create-version', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                version_name: versionName,
+                prompt_type: currentPromptType,
+                prompt_content: promptContent || 'Enter your prompt here...'
+            })
+        });
+
+        const data = await response.json();
+        if (data.status === 'success') {
+            sampleCache.clear();
+            showToast(`✅ Version created! Endpoint: ${data.endpoint_path}`);
+            // The response carries everything the new row needs - add it locally instead of reloading
+            const newPrompt = versionToPrompt({
+                id: data.version_id,
+                version_name: data.version_name,
+                prompt_type: data.prompt_type,
+                prompt_content: promptContent || 'Enter your prompt here...',
+                version_letter: data.version_letter,
+                endpoint_path: data.endpoint_path,
+                status: 'draft'
+            });
+            decoratePrompt(newPrompt);
+            (promptsData[data.prompt_type] = promptsData[data.prompt_type] || []).push(newPrompt);
+            indexPrompts(data.prompt_type);
+            renderTable();
+        } else {
+            showToast('❌ Error: ' + data.message, 'error');
+        }
+    } catch (error) {
+        showToast('❌ Error creating version: ' + error.message, 'error');
+    }
+}
+
+// Close modal on outside click
+DOM.edit_modal?.addEventListener('click', (e) => {
+    if (e.target.id === 'edit-modal') {
+        closeModal();
+    }
+});
+
+// Test Merchant Functions
+// Test merchant form inputs, looked up once and keyed by field name (ids match the API fields)
+const TEST_MERCHANT_FIELD_IDS = ['merchant_name', 'contact_email', 'contact_title', 'merchant_industry', 'merchant_website', 'account_description', 'account_revenue', 'account_employees', 'account_location', 'account_gmv', 'last_activity'];
+const testMerchantFields = Object.fromEntries(TEST_MERCHANT_FIELD_IDS.map(id => [id, document.getElementById(id)]));
+
+async function saveTestMerchant() {
+    const f = testMerchantFields;
+    // Numeric fields are type="number" inputs, so their value is '' or a valid number
+    const formData = {
+        merchant_name: f.merchant_name.value,
+        contact_email: f.contact_email.value,
+        contact_title: f.contact_title.value,
+        merchant_industry: f.merchant_industry.value,
+        merchant_website: f.merchant_website.value,
+        account_description: f.account_description.value,
+        account_revenue: +f.account_revenue.value || 0,
+        account_employees: Math.trunc(+f.account_employees.value) || 0,
+        account_location: f.account_location.value,
+        account_gmv: +f.account_gmv.value || 0,
+        last_activity: f.last_activity.value || 'Recent'
+    };
+
+    if (!formData.merchant_name) {
+        showToast('Please enter a merchant name', 'error');
+        return;
+    }
+
+    try {
+        const response = await fetch('/api/test-merchants/save', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(formData)
+        });
+
+        const data = await response.json();
+        if (data.status === 'success') {
+            sampleCache.clear();
+            showToast('✅ Test merchant saved successfully!');
+        } else {
+            showToast('❌ Error: ' + data.message, 'error');
+        }
+    } catch (error) {
+        showToast('❌ Error saving test merchant: ' + error.message, 'error');
+    }
+}
+
+async function loadTestMerchant() {
+    try {
+        const response = await fetch('/api/test-merchants/get');
+        const data = await response.json();
+
+        if (data.status === 'success' && data.merchant) {
+            const m = data.merchant;
+            TEST_MERCHANT_FIELD_IDS.forEach(id => {
+                testMerchantFields[id].value = m[id] || '';
+            });
+            testMerchantFields.last_activity.value = m.last_activity || 'Recent';
+        }
+    } catch (error) {
+        console.error('Error loading test merchant:', error);
+    }
+}
+
+// Generated samples for unchanged (prompt type, prompt content, context) inputs, most recently used last.
+// Cleared when the test merchant changes, since every sample is written for it, and on every prompt
+// write, since a null prompt (the saved default) keys samples whose prompt may have changed.
+const SAMPLE_CACHE_LIMIT = 32;
+const sampleCache = new Map();
+// Only the latest generate-sample request renders; a new Test / Generate click aborts the one in flight.
+let sampleController = null;
+
+function renderSample(result, targetDiv, renderHtml) {
+    if (renderHtml) {
+        // Display with HTML rendering for proper formatting
+        targetDiv.innerHTML = `<div style="margin-bottom: 16px;"><strong>Subject:</strong> ${result.subject}</div><div style="border-top: 1px solid #e5e7eb; padding-top: 16px;">${result.body}</div>`;
+    } else {
+        targetDiv.textContent = `Subject: ${result.subject}\n\n${result.body}`;
+    }
+}
+
+async function callGenerateSample(promptType, promptContent, context, targetDiv, renderHtml, errorMessage) {
+    if (sampleController) {
+        sampleController.abort();
+        sampleController = null;
+    }
+    const key = JSON.stringify([promptType, promptContent, context]);
+    let result = sampleCache.get(key);
+    if (result) {
+        sampleCache.delete(key);
+        sampleCache.set(key, result);
+        renderSample(result, targetDiv, renderHtml);
+        return;
+    }
+
+    const controller = new AbortController();
+    sampleController = controller;
+    try {
+        const response = await fetch('/api/test-merchants/generate-sample', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                prompt_type: promptType,
+                prompt_content: promptContent,
+                conversation_context: context
+            }),
+            signal: controller.signal
+        });
+
+        const data = await response.json();
+        if (data.status === 'success' && data.responses && data.responses.length > 0) {
+            result = data.responses[0];
+            sampleCache.set(key, result);
+            if (sampleCache.size > SAMPLE_CACHE_LIMIT) {
+                sampleCache.delete(sampleCache.keys().next().value);
+            }
+            renderSample(result, targetDiv, renderHtml);
+        } else {
+            targetDiv.textContent = 'Error: ' + (data.message || errorMessage);
+        }
+    } catch (error) {
+        if (error.name === 'AbortError') {
+            return;
+        }
+        targetDiv.textContent = 'Error: ' + error.message;
+    } finally {
+        if (sampleController === controller) {
+            sampleController = null;
+        }
+    }
+}
+
+async function generateSample() {
+    const promptType = DOM.sample_prompt_type.value;
+    const conversationContext = DOM.conversation_context.value;
+    const customPromptContent = DOM.custom_prompt_content.value.trim();
+
+    // Get current prompt content if editing and no custom prompt provided
+    let promptContent = null;
+    if (customPromptContent) {
+        promptContent = customPromptContent;
+    } else if (currentEditingPrompt && currentEditingPrompt.content) {
+        promptContent = currentEditingPrompt.content;
+    }
+
+    const resultsDiv = DOM.sample_results;
+    const outputDiv = DOM.sample_output;
+
+    outputDiv.textContent = 'Generating sample response...';
+    resultsDiv.style.display = 'block';
+
+    await callGenerateSample(promptType, promptContent, conversationContext, outputDiv, false,
+        'Failed to generate sample');
+}
+
+// Show/hide conversation context based on prompt type
+DOM.sample_prompt_type?.addEventListener('change', (e) => {
+    const contextSection = DOM.conversation_context_section;
+    if (e.target.value === 'reply-email') {
+        contextSection.style.display = 'block';
+    } else {
+        contextSection.style.display = 'none';
+    }
+});
+
+// Test Prompt Function
+async function testPrompt(promptId) {
+    const prompt = findPrompt(promptId);
+    if (!prompt) {
+        showToast('Prompt not found', 'error');
+        return;
+    }
+
+    // Skip test for voice guidelines
+    if (currentPromptType === 'voice-guidelines') {
+        showToast('Cannot test voice guidelines. Please use a new-email, reply-email, or non-campaign-email prompt.', 'error');
+        return;
+    }
+
+    // Show test panel
+    const testPanel = DOM.test_results_panel;
+    const testContent = DOM.test_results_content;
+    const replyInputSection = DOM.test_reply_input_section;
+    const replyInput = DOM.test_reply_input;
+
+    testPanel.style.display = 'block';
+
+    // Determine prompt type
+    const promptType = currentPromptType === 'new-email' ? 'new-email' : (currentPromptType === 'non-campaign-email' ? 'non-campaign-email' : 'reply-email');
+
+    // For reply-email and non-campaign-email, show input box and wait for user input
+    if (promptType === 'reply-email' || promptType === 'non-campaign-email') {
+        replyInputSection.style.display = 'block';
+        testContent.textContent = 'Enter a message above and click "Generate Reply" to test the prompt.';
+        replyInput.value = '';
+        replyInput.focus();
+        // Store prompt info for later use
+        testContent.dataset.promptId = promptId;
+        testContent.dataset.promptContent = prompt.content || '';
+        testContent.dataset.promptType = promptType;
+    } else {
+        // For new-email, generate immediately
+        replyInputSection.style.display = 'none';
+        testContent.textContent = 'Generating test response...';
+
+        await callGenerateSample(promptType, prompt.content || '', '', testContent, true,
+            'Failed to generate sample. Make sure you have saved a test merchant first.');
+    }
+}
+
+// Generate Reply Function (for reply-email prompts)
+async function generateTestReply() {
+    const replyInput = DOM.test_reply_input;
+    const testContent = DOM.test_results_content;
+    const messageToReplyTo = replyInput.value.trim();
+
+    if (!messageToReplyTo) {
+        showToast('Please enter a message to reply to', 'error');
+        return;
+    }
+
+    // Get stored prompt info
+    const promptId = testContent.dataset.promptId;
+    const promptContent = testContent.dataset.promptContent || '';
+    const promptType = testContent.dataset.promptType || 'reply-email';
+
+    if (!promptId) {
+        showToast('Prompt information not found. Please click "Test" again.', 'error');
+        return;
+    }
+
+    testContent.textContent = 'Generating reply...';
+
+    await callGenerateSample(promptType, promptContent, messageToReplyTo, testContent, true,
+        'Failed to generate reply. Make sure you have saved a test merchant first.');
+}
+
+function closeTestPanel() {
+    DOM.test_results_panel.style.display = 'none';
+}
+
+// Delete Prompt Function
+async function deletePrompt(promptId) {
+    const prompt = findPrompt(promptId);
+    if (!prompt) {
+        showToast('Prompt not found', 'error');
+        return;
+    }
+
+    // Check if it's a default prompt (no version_letter)
+    if (!prompt.version_letter) {
+        showToast('Cannot delete default prompts. You can only delete version prompts (A, B, C, etc.).', 'error');
+        return;
+    }
+
+    // Confirm deletion
+    const confirmMessage = `Are you sure you want to delete "${prompt.name}" (Version ${prompt.version_letter})?\n\nThis action cannot be undone.`;
+    if (!await showConfirm(confirmMessage)) {
+        return;
+    }
+
+    try {
+        const versionId = prompt.version_id;
+
+        const response = await fetch('/api/prompts/delete-version', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ version_id: versionId })
+        });
+
+        const data = await response.json();
+        if (data.status === 'success') {
+            sampleCache.clear();
+            showToast('✅ Prompt version deleted successfully!');
+            promptsData[currentPromptType] = (promptsData[currentPromptType] || []).filter(p => p.id !== promptId);
+            indexPrompts(currentPromptType);
+            renderTable();
+        } else {
+            showToast('❌ Error: ' + data.message, 'error');
+        }
+    } catch (error) {
+        showToast('❌ Error deleting prompt: ' + error.message, 'error');
+    }
+}
+
+// Initial load - the script sits after the markup, so start right away instead of waiting for
+// DOMContentLoaded. The page preloads the bootstrap request, so this normally resolves from that.
+(async () => {
+    DEBUG && console.log('Loading prompts and stats...');
+    await refreshAll();
+    DEBUG && console.log('Prompts loaded:', promptsData);
+    DEBUG && console.log('Stats loaded:', variantStats);
+    renderTable();
+})();